@@ -1,13 +1,18 @@
-from collections.abc import Callable
-import os
-import platform
+import bisect
+import sys
+from itertools import chain
+from collections.abc import Callable, Iterable, Sequence
+import datetime
+import functools
+import time
 from typing import Literal
+from rich.text import Text
 from textual import on, work
 from textual.app import App, ComposeResult
 from textual.containers import Horizontal, Vertical, VerticalScroll
 from textual.validation import Validator, ValidationResult
+from textual.worker import Worker, get_current_worker
 from textual.widgets import (
-    RichLog,
     Button,
     Input,
     Label,
@@ -16,16 +21,31 @@ from textual.widgets import (
 )
 
 
-import multiprocessing
-import tempfile
-
-
 from logsift.components.title import Title
+from logsift.components.log_view import LogView, format_text
+from logsift.components.metrics_panel import MetricsPanel
 from logsift.log_collection import LogManager
+from logsift.sources.source import LogSource
+from logsift.sources.command import CommandSource
+from logsift.sources.stdin import StdinSource
+from logsift.sources.file import FileSource
+from logsift.sources.session import SessionSource
+from logsift.sources.spill import SpillSource
 from logsift.components.documentation import Documentation
 from logsift.log import Log
+from logsift.log_store import ChainedLogs, LogStore
+from logsift.cold_storage import ColdStore, is_spill_file
+from logsift.session import save_session
+from logsift.export import copy_logs, save_logs, write_logs
+from logsift.timestamps import default_extractor
 from logsift.filtering import FilterManager
+from logsift.filter_cache import FilterCache
+from logsift.parallel import ParallelFilter
+from logsift.trigram_index import TrigramIndex
+from logsift.frame_scheduler import FrameScheduler
+from logsift.metrics import Metrics, MetricsFileLogger, format_bytes
 from logsift.types.ids import Ids
+from logsift.types.streams import Streams
 from logsift.args import get_args
 from logsift.bindings import BINDINGS as DEFAULT_BINDINGS
 
@@ -36,30 +56,112 @@ class LoggerApp(App):
     CSS_PATH = "css/app.tcss"
     BINDINGS = list(DEFAULT_BINDINGS)  # to make mypy happy :/
 
-    command = get_args()
+    MAX_INGESTED_LOGS = 100_000
+    MAX_BUFFERED_LOGS = 500
 
-    all_ingested_logs: list[Log] = []
-    filtered_logs: list[Log] = []
+    HIGHLIGHT_STYLE = "on #006000"
 
-    filter_manager = FilterManager()
-    filter_mode = Ids.FILTER_OMIT
+    # shown logs are saved to this file in the working directory, see strftime
+    EXPORT_PATH_FORMAT = "logsift-%Y%m%d-%H%M%S.log"
 
-    logs_manager: LogManager
+    # seconds between metrics snapshots
+    METRICS_INTERVAL = 1.0
 
-    MAX_INGESTED_LOGS = 100_000
-    MAX_DISPLAY_LOGS = 500
-    MAX_BUFFERED_LOGS = 500
+    log_store: LogStore
+    filtered_logs: list[Log]
+
+    filter_manager = FilterManager()
+    parallel_filter = ParallelFilter()
+    filter_cache = FilterCache(parallel_filter)
+    filter_mode = Ids.FILTER_OMIT
+    trigram_index: TrigramIndex | None = None
+    cold_store: ColdStore | None = None
+
+    logs_manager: LogManager | None = None
+
+    # queried once mounted, not per ingested batch
+    logger: LogView
+    logs_count_label: Label
+    evicted_logs_count_label: Label
+    buffered_logs_count_label: Label
+    dropped_logs_count_label: Label
+    filtered_logs_count_label: Label
+    filter_explanation_label: Label
+    index_memory_label: Label
+    history_size_label: Label
+    export_progress_label: Label
+    metrics_panel: MetricsPanel
+
+    def __init__(self) -> None:
+        super().__init__()
+
+        # resolved up front, piped stdin has to be detached before the driver starts
+        self.args = get_args()
+
+        self.log_store = LogStore(self.args.max_logs or self.MAX_INGESTED_LOGS)
+        # matching logs, updated in place as logs are ingested
+        self.filtered_logs = []
+
+        if self.args.spill:
+            self.cold_store = ColdStore(self.args.spill_file)
+
+        # matching logs spilled to disk, only the newest are kept like the store
+        self.search_history = False
+        self.history_matches: list[Log] = []
+        self.history_end_seq = 0
+        self.searching_history = False
+
+        self.frame_scheduler = FrameScheduler(self.render_frame, self.args.fps)
+        self.clear_logger_on_frame = False
+
+        self.metrics = Metrics()
+        self.metrics_file: MetricsFileLogger | None = None
+        if self.args.metrics_log is not None:
+            self.metrics_file = MetricsFileLogger(self.args.metrics_log)
+            self.metrics.add_hook(self.metrics_file)
 
     # Backend
 
     def initialise_backend(self) -> None:
-        command = get_args()
-        if command is None:
+        default_extractor.enabled = self.args.timestamps
+
+        source: LogSource
+        if self.args.command is not None:
+            source = CommandSource(self.args.command)
+        elif self.args.file is not None:
+            source = FileSource(
+                self.args.file, self.log_store.capacity, follow=self.args.follow
+            )
+        elif self.args.load is not None:
+            # older logs are only worth loading when they can be spilled to disk
+            max_lines = None if self.cold_store is not None else self.log_store.capacity
+            if is_spill_file(self.args.load):
+                source = SpillSource(self.args.load, max_lines)
+            else:
+                source = SessionSource(self.args.load, max_lines)
+        elif self.args.input_fd is not None:
+            source = StdinSource(self.args.input_fd)
+        else:
             return
 
-        self.logs_manager = LogManager(command, self.ingest_log)
+        self.logs_manager = LogManager(
+            source,
+            self.ingest_logs,
+            self.MAX_BUFFERED_LOGS,
+            self.args.overflow,
+            buffer_callback=self.frame_scheduler.request,
+            error_callback=self.report_source_error,
+        )
         self.logs_manager.run()
 
+    def report_source_error(self, error: BaseException) -> None:
+        self.notify(
+            str(error) or type(error).__name__,
+            title="Reading logs failed",
+            severity="error",
+            timeout=30,
+        )
+
     # Docs
 
     def get_docs_path(self) -> str:
@@ -71,33 +173,83 @@ class LoggerApp(App):
 
     # Logs
 
-    def get_logs(self) -> list[Log]:
+    def get_logs(self) -> Sequence[Log]:
+        if self.filter_manager.is_disabled or self.filter_mode == Ids.FILTER_HIGHLIGHT:
+            return self.log_store
+
+        if self.is_searching_history():
+            return ChainedLogs(self.history_matches, self.filtered_logs)
+
+        return self.filtered_logs
+
+    def is_searching_history(self) -> bool:
         return (
-            self.all_ingested_logs
-            if self.filter_manager.is_disabled
-            else self.filtered_logs
+            self.cold_store is not None
+            and self.search_history
+            and self.filter_mode == Ids.FILTER_OMIT
+            and not self.filter_manager.is_disabled
         )
 
+    def is_highlighted(self, log: Log) -> bool:
+        if self.filter_mode != Ids.FILTER_HIGHLIGHT or self.filter_manager.is_disabled:
+            return False
+
+        # matching logs are ordered by seq, no need for a separate set of them
+        logs = self.filtered_logs
+        index = bisect.bisect_left(logs, log.seq, key=lambda log: log.seq)
+        return index < len(logs) and logs[index] is log
+
+    def format_log(self, log: Log) -> str | Text:
+        if not self.is_highlighted(log):
+            return str(log)
+
+        # formatted like any other log, matches are found in the text as shown
+        text = format_text(log.text)
+
+        spans = self.filter_manager.compiled.match_spans(text.plain)
+        if len(spans) == 0:
+            # matched without a positive term being found, e.g. only negated terms
+            spans = [(0, len(text.plain))]
+
+        for start, end in spans:
+            text.stylize(self.HIGHLIGHT_STYLE, start, end)
+
+        return text
+
+    def all_logs(self) -> Iterable[Log]:
+        """Every log kept, the ones spilled to disk first"""
+        if self.cold_store is None:
+            return self.log_store
+
+        return chain(self.cold_store.iter_logs(), self.log_store)
+
     def ingest_log(self, log: str | Log) -> None:
         if isinstance(log, str):
             log = Log(log)
 
-        if len(self.all_ingested_logs) > self.MAX_INGESTED_LOGS:
-            self.all_ingested_logs.pop(0)
+        self.ingest_logs([log])
 
-        self.all_ingested_logs.append(log)
+    def ingest_logs(self, logs: list[Log]) -> None:
+        evicted = self.log_store.extend(logs)
+        self.metrics.record_ingest(len(logs))
 
-        self.update_log_count()
+        if self.cold_store is not None:
+            self.cold_store.add(evicted)
 
-        if not self.filter_manager.match(str(log)):
-            return
+        # cached filter results would otherwise keep evicted logs alive
+        self.filter_cache.trim(self.log_store)
+
+        if self.trigram_index is not None:
+            # added first, logs evicted straight away are among the new ones
+            self.trigram_index.add(logs)
+            self.trigram_index.remove(evicted)
 
-        self.add_to_logger(str(log))
+        self.frame_scheduler.request()
 
     # Actions
 
     def action_refresh_logger(self) -> None:
-        self.refresh_logger()
+        self.refresh_logger(clear=True)
 
     def action_toggle_visible(self, selector: str) -> None:
         self.query_one(selector).toggle_class("hidden")
@@ -115,26 +267,16 @@ class LoggerApp(App):
         self.query_one(selector, RadioButton).toggle()
 
     def action_copy_shown(self) -> None:
-        text = "\n".join(map(str, self.get_logs()))
-        current_os = platform.platform(aliased=True, terse=True)
-        path = tempfile.mktemp()
+        self.export_shown(copy_logs, "the clipboard")
 
-        with open(path, "w") as f:
-            f.write(text)
-
-        if "Linux" in current_os:
-            os.system(f"cat {path} | xclip -sel clip")
-        elif "MacOS" in current_os:
-            os.system(f"cat {path} | pbcopy")
-        else:
-            raise NotImplementedError(f"Copying not implemented for {current_os=}")
-
-        os.remove(path)
+    def action_save_shown(self) -> None:
+        path = datetime.datetime.now().strftime(self.EXPORT_PATH_FORMAT)
+        self.export_shown(functools.partial(save_logs, path), path)
 
     def action_scroll_logger(
         self, direction: Literal["up", "down", "fup", "fdown"]
     ) -> None:
-        logger = self.query_one(f"#{Ids.LOGGER}", RichLog)
+        logger = self.logger
 
         match direction:
             case "up":
@@ -155,43 +297,57 @@ class LoggerApp(App):
 
     # Logger
 
-    def add_to_logger(self, log_line: str) -> None:
-        logger = self.query_one(f"#{Ids.LOGGER}", RichLog)
-        logger.write(log_line)
+    def request_frame(self, clear_logger: bool = False) -> None:
+        self.clear_logger_on_frame |= clear_logger
+        self.frame_scheduler.request()
 
-    def clear_logger(self) -> None:
-        logger = self.query_one(f"#{Ids.LOGGER}", RichLog)
-        logger.clear()
+    def render_frame(self) -> None:
+        """
+        Catches the display up with everything ingested since the last frame. Filtered
+        logs are only brought up to date here, a frame never filters from scratch
+        """
+        start = time.perf_counter()
 
-    def refresh_logger(self, clear: bool = False) -> None:
-        if clear:
-            self.clear_logger()
+        self.update_filtered_logs()
+        self.update_history_matches()
 
-        for log in self.get_logs()[-self.MAX_DISPLAY_LOGS : :]:
-            self.add_to_logger(str(log))
+        self.update_log_count()
+        self.update_buffered_log_count()
+        self.update_filtered_log_count()
+        self.update_filter_explanation()
 
-    async def update_word_wrap(self) -> None:
-        logger = self.query_one(f"#{Ids.LOGGER}", RichLog)
-        setting = self.query_one(f"#{Ids.WORD_WRAP_TOGGLE}", RadioButton)
+        self.refresh_logger(clear=self.clear_logger_on_frame)
+        self.clear_logger_on_frame = False
 
-        logger.wrap = setting.value
+        self.metrics.record_frame(time.perf_counter() - start)
 
-        await logger.recompose()
-        self.refresh_logger(clear=True)
+    def sample_metrics(self) -> None:
+        self.metrics.sample(self.log_store, self.logs_manager)
 
-    async def update_autoscroll(self) -> None:
-        logger = self.query_one(f"#{Ids.LOGGER}", RichLog)
-        setting = self.query_one(f"#{Ids.AUTO_SCROLL_TOGGLE}", RadioButton)
+    def refresh_logger(self, clear: bool = False) -> None:
+        """Shows the current logs, clear when shown logs may need formatting again"""
+        self.logger.set_logs(self.get_logs(), clear_cache=clear)
 
-        logger.auto_scroll = setting.value
+    def update_word_wrap(self) -> None:
+        setting = self.query_one(f"#{Ids.WORD_WRAP_TOGGLE}", RadioButton)
 
-        await logger.recompose()
-        self.refresh_logger(clear=True)
+        self.logger.wrap = setting.value
+        self.refresh_logger()
+
+    def update_autoscroll(self) -> None:
+        setting = self.query_one(f"#{Ids.AUTO_SCROLL_TOGGLE}", RadioButton)
+
+        self.logger.auto_scroll = setting.value
+        self.refresh_logger()
 
     # Filtering
 
     @work(thread=True, exclusive=True)
     def filter_and_refresh_logs(self) -> None:
+        start = time.perf_counter()
+
+        self.searching_history = True
+
         if self.filter_mode == Ids.FILTER_OMIT:
             self.filter_using_omit()
 
@@ -201,54 +357,219 @@ class LoggerApp(App):
         else:
             raise ValueError(f"No filter mode for {self.filter_mode=}")
 
-        self.update_filtered_log_count()
-        self.update_filter_explanation()
-        self.refresh_logger(clear=True)
+        self.metrics.record_refilter(time.perf_counter() - start)
+
+        # the frame also catches up with logs ingested while filtering
+        self.call_from_thread(self.request_frame, clear_logger=True)
+
+        if self.is_searching_history():
+            self.filter_history()
+        else:
+            self.searching_history = False
+
+    def filter_history(self) -> None:
+        """Searches the logs spilled to disk, showing matches a block at a time"""
+        worker = get_current_worker()
+        compiled = self.filter_manager.compiled
+        end_seq = self.cold_store.end_seq  # type: ignore[union-attr]
+
+        matches: list[Log] = []
+        for block_matches in self.cold_store.search(  # type: ignore[union-attr]
+            compiled, end_seq=end_seq
+        ):
+            if worker.is_cancelled:
+                return
+
+            # a new list each time, the one handed over may be shown right now
+            matches = (matches + block_matches)[-self.log_store.capacity : :]
+            self.call_from_thread(self.show_history_matches, worker, matches)
+
+        self.history_end_seq = end_seq
+        self.searching_history = False
+        self.call_from_thread(self.request_frame)
+
+    def update_filtered_logs(self) -> None:
+        """Brings the filtered logs up to date with the store"""
+        compiled = self.filter_manager.compiled
+        if compiled.disabled:
+            return
+
+        # only ever a few new logs to match, filtering from scratch is left to the
+        # refilter worker, which catches up with the store once done
+        filtered_logs = self.filter_cache.update(compiled, self.log_store)
+        if filtered_logs is not None:
+            self.filtered_logs = filtered_logs
+
+    def update_history_matches(self) -> None:
+        """Searches logs spilled to disk since the last search"""
+        if not self.is_searching_history() or self.searching_history:
+            return
+
+        cold_store = self.cold_store
+        compiled = self.filter_manager.compiled
+        matches = self.history_matches
+        end_seq = cold_store.end_seq  # type: ignore[union-attr]
+
+        # usually still waiting to fill a block, so searched without reading the file
+        for block_matches in cold_store.search(  # type: ignore[union-attr]
+            compiled, self.history_end_seq, end_seq
+        ):
+            matches.extend(block_matches)
+
+        self.history_end_seq = end_seq
+        self.trim_history_matches(matches)
+
+    def show_history_matches(self, worker: Worker, matches: list[Log]) -> None:
+        # a cancelled search could otherwise overwrite the matches of the next one
+        if worker.is_cancelled:
+            return
+
+        self.history_matches = matches
+        self.request_frame()
+
+    def trim_history_matches(self, matches: list[Log]) -> None:
+        overflow = len(matches) - self.log_store.capacity
+        if overflow > 0:
+            del matches[:overflow]
 
     def filter_using_omit(self) -> None:
-        self.filtered_logs = list(
-            filter(
-                lambda log: self.filter_manager.match(log.text),
-                self.all_ingested_logs,
-            )
-        )
+        worker = get_current_worker()
+
+        compiled = self.filter_manager.compiled
+        if compiled.disabled:
+            self.call_from_thread(self.show_filtered_logs, worker, [])
+            return
+
+        # copied rather than changing the lists the logger may be showing right now
+        filtered_logs = self.filter_cache.filter(compiled, self.log_store, copy=True)
+        self.call_from_thread(self.show_filtered_logs, worker, filtered_logs)
+
+    def show_filtered_logs(self, worker: Worker, filtered_logs: list[Log]) -> None:
+        # a cancelled refilter could otherwise overwrite the result of the next one
+        if worker.is_cancelled:
+            return
+
+        self.filtered_logs = filtered_logs
+        # matches from the last search are stale, the history is searched from scratch
+        self.history_matches = []
 
     def filter_using_highlight(self) -> None:
-        logs: list[Log] = []
-        for log in self.all_ingested_logs:
-            log_copy = log.copy()
-            logs.append(log_copy)
+        # every log is shown, the matching ones are only consulted when rendering
+        self.filter_using_omit()
 
-            if (
-                self.filter_manager.match(log.text)
-                and not self.filter_manager.is_disabled
-            ):
-                log_copy.set_prefix("[on #006000]")
-                log_copy.set_suffix("[/on #006000]")
-                continue
+    def update_label(self, label: Label, text: str, layout: bool = False) -> None:
+        if label._renderable == text:
+            return
 
-        self.filtered_logs = logs
+        label._renderable = text
+        label.refresh(layout=layout)
 
     def update_log_count(self) -> None:
-        label = self.query_one("#" + Ids.LOGS_COUNT, Label)
+        self.update_label(
+            self.logs_count_label, f"{len(self.log_store):,} Logs Ingested"
+        )
+        # sequence numbers start at 0, so this is how many have been evicted
+        self.update_label(
+            self.evicted_logs_count_label,
+            f"{self.log_store.first_seq:,} Logs Evicted",
+        )
 
-        label._renderable = f"{len(self.all_ingested_logs):,} Logs Ingested"
-        label.refresh()
+        self.update_index_memory()
+        self.update_history_size()
 
-    def update_filtered_log_count(self) -> None:
-        label = self.query_one("#" + Ids.FILTERED_LOGS_COUNT, Label)
+    def update_history_size(self) -> None:
+        text = "History Off"
+        if self.cold_store is not None:
+            text = (
+                f"{self.cold_store.on_disk:,} Logs On Disk "
+                f"({format_bytes(self.cold_store.disk_usage)})"
+            )
+            if self.cold_store.pending > 0:
+                text += f", {self.cold_store.pending:,} Pending"
+
+        self.update_label(self.history_size_label, text)
+
+    def update_buffered_log_count(self) -> None:
+        buffered, dropped = 0, 0
+        if self.logs_manager is not None:
+            buffered, dropped = self.logs_manager.buffered, self.logs_manager.dropped
 
+        self.update_label(self.buffered_logs_count_label, f"{buffered:,} Logs Buffered")
+        self.update_label(self.dropped_logs_count_label, f"{dropped:,} Logs Dropped")
+
+    def update_index_memory(self) -> None:
+        text = "Index Off"
+        if self.trigram_index is not None:
+            text = f"{self.trigram_index.memory_usage / 2**20:,.1f} MiB Index"
+
+        self.update_label(self.index_memory_label, text)
+
+    def update_filtered_log_count(self) -> None:
         count = 0
         if not self.filter_manager.is_disabled:
             count = len(self.filtered_logs)
 
-        label._renderable = f"{count:,} Filtered Logs"
-        label.refresh()
+        self.update_label(self.filtered_logs_count_label, f"{count:,} Filtered Logs")
 
     def update_filter_explanation(self) -> None:
-        label = self.query_one("#" + Ids.FILTER_EXPLANATION, Label)
-        label._renderable = self.filter_manager.build_explanation()
-        label.refresh(layout=True)
+        self.update_label(
+            self.filter_explanation_label,
+            self.filter_manager.build_explanation(),
+            layout=True,
+        )
+
+    # Exporting
+
+    def export_shown(self, export: Callable[..., int], destination: str) -> None:
+        # only references are copied, the shown logs can change while exporting
+        self.export_logs(export, destination, list(self.get_logs()))
+
+    @work(thread=True, exclusive=True, group="export")
+    def export_logs(
+        self, export: Callable[..., int], destination: str, logs: list[Log]
+    ) -> None:
+        worker = get_current_worker()
+        total = len(logs)
+
+        def progress(written: int) -> None:
+            self.call_from_thread(
+                self.update_label,
+                self.export_progress_label,
+                f"Exporting {written:,}/{total:,} Logs",
+            )
+
+        try:
+            written = export(
+                logs, progress=progress, cancelled=lambda: worker.is_cancelled
+            )
+        except (OSError, RuntimeError) as error:
+            self.call_from_thread(
+                self.notify, str(error), title="Export failed", severity="error"
+            )
+            return
+
+        if worker.is_cancelled:
+            return
+
+        message = f"Exported {written:,} Logs to {destination}"
+        self.call_from_thread(self.update_label, self.export_progress_label, message)
+        self.call_from_thread(self.notify, message)
+
+    # Indexing
+
+    def set_indexing(self, enabled: bool) -> None:
+        if enabled == (self.trigram_index is not None):
+            return
+
+        index = None
+        if enabled:
+            index = TrigramIndex()
+            index.add(self.log_store)
+
+        self.trigram_index = index
+        self.filter_cache.index = index
+
+        self.update_index_memory()
 
     # Input
 
@@ -300,6 +621,9 @@ class LoggerApp(App):
 
         match id_:
             case Ids.PAUSE_INGESTING_LOGS_TOGGLE:
+                if self.logs_manager is None:
+                    return
+
                 self.logs_manager.ingest_logs = not value
 
                 if value is False:
@@ -312,6 +636,19 @@ class LoggerApp(App):
             case Ids.CASE_INSENSITIVE_TOGGLE:
                 self.filter_manager.case_insensitive = value
 
+            case Ids.STDOUT_TOGGLE:
+                self.filter_manager.set_stream_shown(Streams.STDOUT, value)
+
+            case Ids.STDERR_TOGGLE:
+                self.filter_manager.set_stream_shown(Streams.STDERR, value)
+
+            case Ids.SEARCH_HISTORY_TOGGLE:
+                self.search_history = value
+
+            case Ids.TRIGRAM_INDEX_TOGGLE:
+                self.set_indexing(value)
+                refilter = False
+
             case Ids.FILTER_HIGHLIGHT:
                 self.filter_mode = id_
 
@@ -322,10 +659,12 @@ class LoggerApp(App):
                 self.filter_manager.set_match_all(value)
 
             case Ids.WORD_WRAP_TOGGLE:
-                await self.update_word_wrap()
+                self.update_word_wrap()
+                refilter = False
 
             case Ids.AUTO_SCROLL_TOGGLE:
-                await self.update_autoscroll()
+                self.update_autoscroll()
+                refilter = False
 
             case _:
                 raise ValueError(f"No case for {id_}")
@@ -336,9 +675,43 @@ class LoggerApp(App):
     # App control
 
     def on_exit_app(self) -> None:
-        self.logs_manager.stop()
+        if self.logs_manager is not None:
+            self.logs_manager.stop()
+
+        self.frame_scheduler.cancel()
+        self.filter_cache.shutdown()
+
+        if self.metrics_file is not None:
+            self.metrics_file.close()
 
     def on_mount(self) -> None:
+        self.logger = self.query_one(f"#{Ids.LOGGER}", LogView)
+        self.logs_count_label = self.query_one(f"#{Ids.LOGS_COUNT}", Label)
+        self.evicted_logs_count_label = self.query_one(
+            f"#{Ids.EVICTED_LOGS_COUNT}", Label
+        )
+        self.buffered_logs_count_label = self.query_one(
+            f"#{Ids.BUFFERED_LOGS_COUNT}", Label
+        )
+        self.dropped_logs_count_label = self.query_one(
+            f"#{Ids.DROPPED_LOGS_COUNT}", Label
+        )
+        self.filtered_logs_count_label = self.query_one(
+            f"#{Ids.FILTERED_LOGS_COUNT}", Label
+        )
+        self.filter_explanation_label = self.query_one(
+            f"#{Ids.FILTER_EXPLANATION}", Label
+        )
+        self.index_memory_label = self.query_one(f"#{Ids.INDEX_MEMORY}", Label)
+        self.history_size_label = self.query_one(f"#{Ids.HISTORY_SIZE}", Label)
+        self.export_progress_label = self.query_one(f"#{Ids.EXPORT_PROGRESS}", Label)
+        self.metrics_panel = self.query_one(f"#{Ids.METRICS_PANEL}", MetricsPanel)
+
+        self.logger.render_callback = self.metrics.record_render
+        self.metrics.add_hook(self.metrics_panel.update_snapshot)
+        self.set_interval(self.METRICS_INTERVAL, self.sample_metrics)
+
+        self.set_indexing(self.args.use_index)
         self.initialise_backend()
 
     # Rendering
@@ -346,14 +719,8 @@ class LoggerApp(App):
     def compose(self) -> ComposeResult:
         with Horizontal(id="app-container"):
             with Vertical(id="logger-container"):
-                # TODO: add pagination
-                yield RichLog(
-                    highlight=True,
-                    markup=True,
-                    wrap=False,
-                    max_lines=self.MAX_DISPLAY_LOGS,
-                    id=Ids.LOGGER,
-                    auto_scroll=True,
+                yield LogView(
+                    self.format_log, wrap=False, auto_scroll=True, id=Ids.LOGGER
                 )
 
                 with Horizontal(id=Ids.FILTER_CONTAINER):
@@ -379,10 +746,22 @@ class LoggerApp(App):
                 yield Title("Info", variant="h1", padding=False)
 
                 yield Label("0 Logs Ingested", id=Ids.LOGS_COUNT, classes="full-width")
+                yield Label(
+                    "0 Logs Evicted", id=Ids.EVICTED_LOGS_COUNT, classes="full-width"
+                )
+                yield Label(
+                    "0 Logs Buffered", id=Ids.BUFFERED_LOGS_COUNT, classes="full-width"
+                )
+                yield Label(
+                    "0 Logs Dropped", id=Ids.DROPPED_LOGS_COUNT, classes="full-width"
+                )
                 yield Label(
                     "0 Filtered Logs", id=Ids.FILTERED_LOGS_COUNT, classes="full-width"
                 )
                 yield Label("", id=Ids.FILTER_EXPLANATION, classes="full-width")
+                yield Label("Index Off", id=Ids.INDEX_MEMORY, classes="full-width")
+                yield Label("History Off", id=Ids.HISTORY_SIZE, classes="full-width")
+                yield Label("No Exports", id=Ids.EXPORT_PROGRESS, classes="full-width")
 
                 yield Title("Filtering", variant="h1")
 
@@ -397,6 +776,13 @@ class LoggerApp(App):
                     classes="settings-radio-button",
                     tooltip="(p) Pause logs being ingested",
                 )
+                yield RadioButton(
+                    "Index Logs",
+                    value=self.args.use_index,
+                    id=Ids.TRIGRAM_INDEX_TOGGLE,
+                    classes="settings-radio-button",
+                    tooltip="(i) Index logs so filtering only checks likely matches",
+                )
 
                 yield Title("Filter Settings", variant="h2")
 
@@ -422,6 +808,29 @@ class LoggerApp(App):
                     tooltip="(c) Toggle case sensitivity/insensitivity",
                 )
 
+                yield RadioButton(
+                    "Show stdout",
+                    value=True,
+                    id=Ids.STDOUT_TOGGLE,
+                    classes="settings-radio-button",
+                    tooltip="(s) Toggle showing logs from stdout",
+                )
+                yield RadioButton(
+                    "Show stderr",
+                    value=True,
+                    id=Ids.STDERR_TOGGLE,
+                    classes="settings-radio-button",
+                    tooltip="(e) Toggle showing logs from stderr",
+                )
+
+                yield RadioButton(
+                    "Search History",
+                    value=False,
+                    id=Ids.SEARCH_HISTORY_TOGGLE,
+                    classes="settings-radio-button",
+                    tooltip="(h) Also search logs spilled to disk, needs --spill",
+                )
+
                 yield Title("Filter Mode", variant="h2")
 
                 with RadioSet(classes="settings-radio-button"):
@@ -456,17 +865,23 @@ class LoggerApp(App):
                     tooltip="(w) Toggle word-wrapping logs",
                 )
 
+            yield MetricsPanel(id=Ids.METRICS_PANEL, classes="hidden")
+
             yield Documentation(
                 self.load_docs(), id=Ids.DOCUMENTATION_CONTAINER, classes="hidden"
             )
 
 
 if __name__ == "__main__":
-    # fix for macs
-    multiprocessing.set_start_method("fork")
-
     app = LoggerApp()
     app.run()
 
-    # release logs before exiting
-    print("\n".join(map(str, app.all_ingested_logs)))
+    try:
+        # release the logs kept in memory before exiting, spilled logs stay on disk
+        write_logs(app.log_store, sys.stdout.buffer)
+
+        if app.args.save is not None:
+            save_session(app.args.save, app.all_logs(), app.args.timestamps)
+    finally:
+        if app.cold_store is not None:
+            app.cold_store.close()
@@ -1,10 +1,159 @@
-import sys
+import argparse
+import functools
+import os
+from typing import NamedTuple
+from logsift.cold_storage import is_spill_file
+from logsift.session import is_session
+from logsift.sources.stdin import detach_piped_stdin
+from logsift.types.overflow import OverflowPolicies
 
 
-def get_args() -> str | None:
-    if len(sys.argv) < 1:
-        return None
+class Args(NamedTuple):
+    command: str | None
+    input_fd: int | None
+    file: str | None
+    follow: bool
+    timestamps: bool
+    max_logs: int | None
+    use_index: bool
+    fps: float
+    overflow: str
+    metrics_log: str | None
+    spill: bool
+    spill_file: str | None
+    save: str | None
+    load: str | None
 
-    command = " ".join(sys.argv[1::])
 
-    return command
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="logsift", description="Quickly filter your logs from any command"
+    )
+    parser.add_argument(
+        "--file",
+        metavar="PATH",
+        help="read logs from a file instead of a command, the file is memory mapped "
+        "unless followed",
+    )
+    parser.add_argument(
+        "--follow",
+        action="store_true",
+        help="keep reading lines appended to --file, like tail -f",
+    )
+    parser.add_argument(
+        "--no-timestamps",
+        dest="timestamps",
+        action="store_false",
+        help="don't look for timestamps stated in log lines",
+    )
+    parser.add_argument(
+        "--max-logs",
+        metavar="COUNT",
+        type=int,
+        help="maximum number of logs kept in memory, oldest are evicted first",
+    )
+    parser.add_argument(
+        "--index",
+        action="store_true",
+        help="index logs as they are ingested so filtering skips non-matching ones",
+    )
+    parser.add_argument(
+        "--fps",
+        type=float,
+        default=30,
+        help="maximum number of times a second the display is updated (default: 30)",
+    )
+    parser.add_argument(
+        "--overflow",
+        choices=OverflowPolicies.ALL,
+        default=OverflowPolicies.DROP_OLDEST,
+        help="what to do with new logs once the buffer is full while paused "
+        "(default: drop-oldest)",
+    )
+    parser.add_argument(
+        "--spill",
+        action="store_true",
+        help="keep logs evicted from memory compressed in a temporary file",
+    )
+    parser.add_argument(
+        "--spill-file",
+        metavar="PATH",
+        help="like --spill, but keep the file at PATH once done, to be reopened with "
+        "--load",
+    )
+    parser.add_argument(
+        "--save",
+        metavar="SESSION",
+        help="save every log kept to SESSION on exit, to be reopened with --load",
+    )
+    parser.add_argument(
+        "--load",
+        metavar="SESSION",
+        help="reopen a session saved with --save, or a file kept with --spill-file, "
+        "instead of running a command",
+    )
+    parser.add_argument(
+        "--metrics-log",
+        metavar="PATH",
+        help="append a line of JSON with the performance metrics to PATH every second",
+    )
+    parser.add_argument(
+        "command",
+        nargs=argparse.REMAINDER,
+        help="command to run and collect logs from",
+    )
+
+    return parser
+
+
+@functools.cache
+def get_args() -> Args:
+    # cached, piped stdin can only be detached once
+    parser = build_parser()
+    parsed = parser.parse_args()
+
+    if parsed.max_logs is not None and parsed.max_logs < 1:
+        parser.error("--max-logs must be at least 1")
+
+    if parsed.fps <= 0:
+        parser.error("--fps must be positive")
+
+    if parsed.file is not None and not os.access(parsed.file, os.R_OK):
+        parser.error(f"--file {parsed.file} can't be read")
+
+    if parsed.follow and parsed.file is None:
+        parser.error("--follow needs --file")
+
+    if parsed.file is not None and len(parsed.command) > 0:
+        parser.error("--file can't be used together with a command")
+
+    if parsed.spill_file is not None and os.path.exists(parsed.spill_file):
+        parser.error(f"--spill-file {parsed.spill_file} already exists")
+
+    if parsed.load is not None and not (
+        is_session(parsed.load) or is_spill_file(parsed.load)
+    ):
+        parser.error(f"--load {parsed.load} is not a saved session or spill file")
+
+    command = " ".join(parsed.command) or None
+
+    input_fd = None
+    if command is None and parsed.file is None and parsed.load is None:
+        input_fd = detach_piped_stdin()
+
+    return Args(
+        command,
+        input_fd,
+        parsed.file,
+        parsed.follow,
+        parsed.timestamps,
+        parsed.max_logs,
+        parsed.index,
+        parsed.fps,
+        parsed.overflow,
+        parsed.metrics_log,
+        parsed.spill or parsed.spill_file is not None,
+        parsed.spill_file,
+        parsed.save,
+        parsed.load,
+    )
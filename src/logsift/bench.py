@@ -0,0 +1,510 @@
+"""
+Synthetic benchmarks for the ingest, filter, store and render paths.
+
+    python -m logsift.bench --quick
+    python -m logsift.bench --json > before.json
+
+Workloads are generated from a fixed seed, so results from different versions can
+be compared with each other. Each one runs in a process of its own, so its peak
+memory isn't that of the workloads before it.
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import multiprocessing
+import platform
+import random
+import sys
+import time
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from importlib.metadata import PackageNotFoundError, version
+from rich.console import Console
+from rich.text import Text
+from logsift.components.log_view import format_text, render_text
+from logsift.filter_cache import FilterCache
+from logsift.filtering import FilterManager
+from logsift.log import Log
+from logsift.log_collection import LogManager
+from logsift.log_store import LogStore
+from logsift.parallel import ParallelFilter
+from logsift.sources.source import LogSource
+from logsift.trigram_index import TrigramIndex
+from logsift.types.streams import Streams
+
+try:
+    import resource
+except ImportError:  # not available on windows
+    resource = None  # type: ignore[assignment]
+
+
+HOSTS = ("web-01", "web-02", "db-01", "cache-01", "worker-07")
+SERVICES = ("sshd", "nginx", "postgres", "cron", "kernel", "systemd", "dockerd")
+LEVELS = ("DEBUG", "INFO", "INFO", "INFO", "WARN", "ERROR")
+WORDS = (
+    "connection",
+    "request",
+    "timeout",
+    "error",
+    "user",
+    "session",
+    "started",
+    "finished",
+    "failed",
+    "retry",
+    "cache",
+    "miss",
+    "query",
+    "token",
+    "expired",
+    "upstream",
+)
+PATHS = ("/", "/api/v1/users", "/api/v1/orders", "/login", "/static/app.js")
+METHODS = ("GET", "GET", "GET", "POST", "PUT", "DELETE")
+STATUSES = (200, 200, 200, 201, 301, 404, 500)
+MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun")
+
+
+def _message(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 12)))
+
+
+def syslog_line(rng: random.Random, index: int) -> str:
+    return (
+        f"{rng.choice(MONTHS)} {rng.randint(1, 28):>2} "
+        f"{rng.randint(0, 23):02}:{rng.randint(0, 59):02}:{rng.randint(0, 59):02} "
+        f"{rng.choice(HOSTS)} {rng.choice(SERVICES)}[{rng.randint(100, 9999)}]: "
+        f"{_message(rng)} id={index}"
+    )
+
+
+def json_line(rng: random.Random, index: int) -> str:
+    return json.dumps(
+        {
+            "time": f"2024-{rng.randint(1, 12):02}-{rng.randint(1, 28):02}T"
+            f"{rng.randint(0, 23):02}:{rng.randint(0, 59):02}:{rng.randint(0, 59):02}Z",
+            "level": rng.choice(LEVELS),
+            "host": rng.choice(HOSTS),
+            "msg": _message(rng),
+            "request_id": index,
+        }
+    )
+
+
+def nginx_line(rng: random.Random, index: int) -> str:
+    return (
+        f"10.0.{rng.randint(0, 255)}.{rng.randint(0, 255)} - - "
+        f"[{rng.randint(1, 28):02}/{rng.choice(MONTHS)}/2024:"
+        f"{rng.randint(0, 23):02}:{rng.randint(0, 59):02}:{rng.randint(0, 59):02} +0000] "
+        f'"{rng.choice(METHODS)} {rng.choice(PATHS)}?id={index} HTTP/1.1" '
+        f'{rng.choice(STATUSES)} {rng.randint(0, 50_000)} "-" "curl/8.0"'
+    )
+
+
+GENERATORS: dict[str, Callable[[random.Random, int], str]] = {
+    "syslog": syslog_line,
+    "json": json_line,
+    "nginx": nginx_line,
+}
+
+
+# rendering is only ever done for a screenful of logs at a time
+RENDER_LINES = 5_000
+
+# a term as typed first, then narrowed down in "match all" mode
+REFILTER_TERMS = {
+    "syslog": ("timeout", "timeout retry"),
+    "json": ("timeout", "timeout retry"),
+    "nginx": ("/api", "/api POST"),
+}
+
+
+def generate(kind: str, count: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    line = GENERATORS[kind]
+    return [line(rng, index) for index in range(count)]
+
+
+def peak_rss() -> int | None:
+    """Peak resident memory of this process in bytes"""
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes everywhere but macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _timed(function: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+class SyntheticSource(LogSource):
+    """Feeds pre-encoded lines in bursts, optionally paced to a fixed rate"""
+
+    def __init__(self, lines: list[str], burst: int, rate: float | None = None) -> None:
+        self._chunks = [
+            ("\n".join(lines[index : index + burst]) + "\n").encode()
+            for index in range(0, len(lines), burst)
+        ]
+        self._burst = burst
+        self._rate = rate
+        self._running = True
+
+    async def run(self, manager: LogManager) -> None:
+        start = time.perf_counter()
+
+        for index, chunk in enumerate(self._chunks):
+            if not self._running:
+                break
+
+            manager.feed(chunk, Streams.STDOUT)
+
+            delay = 0.0
+            if self._rate is not None:
+                due = start + (index + 1) * self._burst / self._rate
+                delay = due - time.perf_counter()
+            await asyncio.sleep(max(0.0, delay))
+
+        manager.feed_eof(Streams.STDOUT)
+
+    def stop(self) -> None:
+        self._running = False
+
+
+def bench_ingest(
+    lines: list[str], burst: int, rate: float | None, capacity: int
+) -> dict:
+    store = LogStore(capacity)
+
+    def ingest(logs: list[Log]) -> None:
+        store.extend(logs)
+
+    manager = LogManager(SyntheticSource(lines, burst, rate), ingest)
+
+    async def run() -> float:
+        start = time.perf_counter()
+        manager.run()
+        await manager._task  # type: ignore[misc]
+        return time.perf_counter() - start
+
+    elapsed = asyncio.run(run())
+
+    result = {
+        "lines": len(lines),
+        "burst": burst,
+        "seconds": elapsed,
+        "lines_per_second": len(lines) / elapsed,
+    }
+    if rate is not None:
+        result["target_rate"] = rate
+        result["kept_up"] = len(lines) / elapsed >= rate * 0.95
+
+    return result
+
+
+def bench_log_construction(lines: list[str]) -> dict:
+    logs: list[Log] = []
+    construct = _timed(lambda: logs.extend(Log(line) for line in lines))
+    timestamps = _timed(lambda: [log.stated_timestamp for log in logs])
+
+    return {
+        "lines": len(lines),
+        "construct_ns_per_log": construct / len(lines) * 1e9,
+        "timestamp_ns_per_log": timestamps / len(lines) * 1e9,
+    }
+
+
+def bench_match(lines: list[str], term_counts: tuple[int, ...]) -> list[dict]:
+    results = []
+    for count in term_counts:
+        terms = " ".join(WORDS[index % len(WORDS)] for index in range(count))
+
+        for match_all in (False, True):
+            manager = FilterManager()
+            manager.set_filter(terms)
+            manager.set_match_all(match_all)
+
+            elapsed = _timed(lambda: sum(map(manager.match, lines)))
+            results.append(
+                {
+                    "terms": count,
+                    "mode": "all" if match_all else "any",
+                    "lines_per_second": len(lines) / elapsed,
+                }
+            )
+
+    return results
+
+
+def bench_render(lines: list[str], width: int = 120) -> dict:
+    """Rows built as LogView builds them, for plain and highlighted logs"""
+    console = Console(width=width, file=io.StringIO())
+    compiled = _compiled(REFILTER_TERMS["syslog"][0])
+
+    def highlighted(line: str) -> Text:
+        # as LoggerApp.format_log does for a matching log
+        text = format_text(line)
+        for start, end in compiled.match_spans(text.plain) or [(0, len(text.plain))]:
+            text.stylize("on #006000", start, end)
+        return text
+
+    result: dict = {"lines": len(lines), "width": width}
+    for name, format_ in (("plain", format_text), ("highlighted", highlighted)):
+        for wrap in (False, True):
+            elapsed = _timed(
+                lambda: [
+                    render_text(format_(line), console, width, wrap) for line in lines
+                ]
+            )
+            result[f"{name}{'_wrapped' if wrap else ''}_us_per_log"] = (
+                elapsed / len(lines) * 1e6
+            )
+
+    return result
+
+
+def _compiled(filter_: str, match_all: bool = False, case_insensitive: bool = True):
+    manager = FilterManager()
+    manager.set_filter(filter_)
+    manager.set_match_all(match_all)
+    manager.case_insensitive = case_insensitive
+    return manager.compiled
+
+
+def bench_refilter(
+    kind: str, size: int, seed: int, index: bool, parallel: bool = False
+) -> dict:
+    store = LogStore(size)
+    store.extend(Log(line) for line in generate(kind, size, seed))
+
+    result: dict = {"retained": size}
+
+    parallel_filter = None
+    if parallel:
+        parallel_filter = ParallelFilter()
+        result["workers"] = parallel_filter.workers
+
+    cache = FilterCache(parallel_filter)
+
+    typed = _compiled(REFILTER_TERMS[kind][0])
+    narrowed = _compiled(REFILTER_TERMS[kind][1], match_all=True)
+    # no cached result helps with it, so the whole store is scanned again
+    rescanned = _compiled(REFILTER_TERMS[kind][0], case_insensitive=False)
+
+    if index:
+        trigram_index = TrigramIndex()
+        result["index_build_seconds"] = _timed(lambda: trigram_index.add(store))
+        result["index_bytes"] = trigram_index.memory_usage
+        cache.index = trigram_index
+
+    # typing a term, then narrowing it down, then new logs arriving. As in the app,
+    # the first filter starts the workers in the background and runs serially
+    result["cold_ms"] = _timed(lambda: cache.filter(typed, store)) * 1e3
+    result["narrow_ms"] = _timed(lambda: cache.filter(narrowed, store)) * 1e3
+
+    if parallel_filter is not None:
+        spawn_start = time.perf_counter()
+        parallel_filter.start(wait=True)
+        result["spawn_wait_ms"] = (time.perf_counter() - spawn_start) * 1e3
+        result["parallel"] = parallel_filter.should_use(size)
+
+    result["rescan_ms"] = _timed(lambda: cache.filter(rescanned, store)) * 1e3
+
+    new_logs = [Log(line) for line in generate(kind, 1_000, seed + 1)]
+    evicted = store.extend(new_logs)
+    if index:
+        trigram_index.add(new_logs)
+        trigram_index.remove(evicted)
+
+    # as every frame does
+    result["update_ms"] = _timed(lambda: cache.update(narrowed, store)) * 1e3
+    result["matched"] = len(cache.filter(narrowed, store))
+
+    cache.shutdown()
+    return result
+
+
+def run_workload(
+    kind: str,
+    sizes: tuple[int, ...],
+    lines: int,
+    burst: int,
+    rate: float | None,
+    index: bool,
+    seed: int,
+) -> dict:
+    generated = generate(kind, lines, seed)
+
+    workload: dict = {
+        "ingest": bench_ingest(generated, burst, rate, capacity=lines),
+        "log_construction": bench_log_construction(generated),
+        "match": bench_match(generated, (1, 2, 4, 8, 16)),
+        "render": bench_render(generated[:RENDER_LINES]),
+        "refilter": [bench_refilter(kind, size, seed, False) for size in sizes],
+        "refilter_parallel": [
+            bench_refilter(kind, size, seed, False, parallel=True) for size in sizes
+        ],
+    }
+    if index:
+        workload["refilter_indexed"] = [
+            bench_refilter(kind, size, seed, True) for size in sizes
+        ]
+
+    workload["peak_rss_bytes"] = peak_rss()
+    return workload
+
+
+def run_benchmarks(
+    kinds: tuple[str, ...],
+    sizes: tuple[int, ...],
+    lines: int,
+    burst: int,
+    rate: float | None,
+    index: bool,
+    seed: int,
+) -> dict:
+    try:
+        logsift_version = version("logsift")
+    except PackageNotFoundError:
+        logsift_version = "unknown"
+
+    report: dict = {
+        "logsift": logsift_version,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+        "workloads": {},
+    }
+
+    for kind in kinds:
+        # a fresh process per workload, peak memory never goes down within one
+        with ProcessPoolExecutor(
+            1, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            report["workloads"][kind] = executor.submit(
+                run_workload, kind, sizes, lines, burst, rate, index, seed
+            ).result()
+
+    return report
+
+
+def print_report(report: dict) -> None:
+    print(f"logsift {report['logsift']}, python {report['python']}")
+
+    for kind, workload in report["workloads"].items():
+        print(f"\n{kind}")
+
+        ingest = workload["ingest"]
+        print(f"  ingest             {ingest['lines_per_second']:>12,.0f} lines/s")
+
+        construction = workload["log_construction"]
+        print(
+            f"  Log()              {construction['construct_ns_per_log']:>12,.0f} ns/log"
+            f"   timestamp {construction['timestamp_ns_per_log']:,.0f} ns/log"
+        )
+
+        for match in workload["match"]:
+            print(
+                f"  match {match['terms']:>2} {match['mode']:<3} terms "
+                f"{match['lines_per_second']:>12,.0f} lines/s"
+            )
+
+        render = workload["render"]
+        for name in ("plain", "highlighted"):
+            print(
+                f"  render {name:<11} {render[f'{name}_us_per_log']:>12,.1f} us/log"
+                f"   wrapped {render[f'{name}_wrapped_us_per_log']:,.1f} us/log"
+            )
+
+        for name in ("refilter", "refilter_parallel", "refilter_indexed"):
+            for refilter in workload.get(name, ()):
+                workers = ""
+                if "workers" in refilter:
+                    serial = "" if refilter["parallel"] else ", serial"
+                    workers = (
+                        f"  ({refilter['workers']} workers{serial}, waited "
+                        f"{refilter['spawn_wait_ms']:.0f} ms for them)"
+                    )
+
+                print(
+                    f"  {name:<17} {refilter['retained']:>9,} logs"
+                    f"  cold {refilter['cold_ms']:8.1f} ms"
+                    f"  narrow {refilter['narrow_ms']:8.1f} ms"
+                    f"  rescan {refilter['rescan_ms']:8.1f} ms"
+                    f"  update {refilter['update_ms']:6.1f} ms{workers}"
+                )
+
+        if workload["peak_rss_bytes"] is not None:
+            print(
+                f"  peak rss           {workload['peak_rss_bytes'] / 2**20:>12,.1f} MiB"
+            )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m logsift.bench", description="Benchmark LogSift's hot paths"
+    )
+    parser.add_argument(
+        "--workloads",
+        default=",".join(GENERATORS),
+        help="comma separated workloads to run (default: all of them)",
+    )
+    parser.add_argument(
+        "--sizes",
+        default="10000,100000,1000000",
+        help="comma separated amounts of retained logs to refilter",
+    )
+    parser.add_argument(
+        "--lines", type=int, default=200_000, help="lines to ingest and match"
+    )
+    parser.add_argument(
+        "--burst", type=int, default=1_000, help="lines fed to LogManager at once"
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        help="lines per second to feed at, as fast as possible if unset",
+    )
+    parser.add_argument(
+        "--index", action="store_true", help="also refilter with the trigram index"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--quick", action="store_true", help="smaller workloads, for a quick check"
+    )
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+
+    return parser
+
+
+def main() -> None:
+    args = build_parser().parse_args()
+
+    kinds = tuple(kind for kind in args.workloads.split(",") if kind)
+    for kind in kinds:
+        if kind not in GENERATORS:
+            raise SystemExit(f"Unknown workload {kind}, pick from {list(GENERATORS)}")
+
+    sizes = tuple(int(size) for size in args.sizes.split(",") if size)
+    lines = args.lines
+    if args.quick:
+        sizes = tuple(size for size in sizes if size <= 100_000)
+        lines = min(lines, 20_000)
+
+    report = run_benchmarks(
+        kinds, sizes, lines, args.burst, args.rate, args.index, args.seed
+    )
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
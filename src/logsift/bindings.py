@@ -32,6 +32,26 @@ BINDINGS: tuple[Binding, ...] = (
         action=f"toggle_setting('#{Ids.CASE_INSENSITIVE_TOGGLE}')",
         description="Toggle case sensitivity/insensitivity",
     ),
+    Binding(
+        "s",
+        action=f"toggle_setting('#{Ids.STDOUT_TOGGLE}')",
+        description="Toggle showing logs from stdout",
+    ),
+    Binding(
+        "e",
+        action=f"toggle_setting('#{Ids.STDERR_TOGGLE}')",
+        description="Toggle showing logs from stderr",
+    ),
+    Binding(
+        "i",
+        action=f"toggle_setting('#{Ids.TRIGRAM_INDEX_TOGGLE}')",
+        description="Toggle indexing logs for faster filtering",
+    ),
+    Binding(
+        "h",
+        action=f"toggle_setting('#{Ids.SEARCH_HISTORY_TOGGLE}')",
+        description="Toggle searching logs spilled to disk",
+    ),
     Binding(
         "o",
         action=f"toggle_setting('#{Ids.FILTER_OMIT}')",
@@ -52,6 +72,11 @@ BINDINGS: tuple[Binding, ...] = (
         action=f"toggle_visible('#{Ids.DOCUMENTATION_CONTAINER}')",
         description="Toggle docs panel visibility",
     ),
+    Binding(
+        "P",
+        action=f"toggle_visible('#{Ids.METRICS_PANEL}')",
+        description="Toggle performance panel visibility",
+    ),
     Binding(
         "j,down",
         action="scroll_logger('down')",
@@ -77,6 +102,11 @@ BINDINGS: tuple[Binding, ...] = (
         action="copy_shown",
         description="Copy filtered logs to clipboard",
     ),
+    Binding(
+        "E",
+        action="save_shown",
+        description="Save filtered logs to a file",
+    ),
     Binding(
         "w",
         action=f"toggle_setting('#{Ids.WORD_WRAP_TOGGLE}')",
@@ -0,0 +1,359 @@
+import bisect
+import os
+import struct
+import tempfile
+import threading
+import zlib
+from array import array
+from collections.abc import Iterable, Iterator
+from typing import BinaryIO, NamedTuple
+from logsift.filtering import CompiledFilter
+from logsift.log import Log
+from logsift.types.streams import Streams
+
+try:
+    import zstandard
+except ImportError:  # optional, see the "fast" extra
+    zstandard = None  # type: ignore[assignment]
+
+
+class Codecs:
+    ZLIB = 0
+    ZSTD = 1
+
+
+_FILE_MAGIC = b"LSCOLD1\n"
+# codec, first seq, log count, first and last ingest time, compressed size
+_BLOCK_HEADER = struct.Struct("<BqIddI")
+
+
+def is_spill_file(path: str) -> bool:
+    try:
+        with open(path, "rb") as file:
+            return file.read(len(_FILE_MAGIC)) == _FILE_MAGIC
+    except OSError:
+        return False
+
+
+class ColdBlock(NamedTuple):
+    offset: int
+    size: int
+    codec: int
+    first_seq: int
+    line_count: int
+    first_time: float
+    last_time: float
+
+    @property
+    def end_seq(self) -> int:
+        return self.first_seq + self.line_count
+
+
+def _compress(data: bytes) -> tuple[int, bytes]:
+    if zstandard is not None:
+        return Codecs.ZSTD, zstandard.ZstdCompressor(level=3).compress(data)
+
+    return Codecs.ZLIB, zlib.compress(data, 6)
+
+
+def _decompress(codec: int, data: bytes) -> bytes:
+    if codec == Codecs.ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstandard is needed to read this block")
+        return zstandard.ZstdDecompressor().decompress(data)
+
+    return zlib.decompress(data)
+
+
+def encode_block(logs: list[Log]) -> bytes:
+    """
+    Lays the logs out column by column, text lengths, streams (a byte each, see
+    Streams.INDEX), ingest times and finally the text itself, similar values next to
+    each other compress better
+    """
+    texts = [log.text.encode("utf-8", errors="replace") for log in logs]
+
+    lengths = array("I", map(len, texts))
+    streams = bytes(Streams.INDEX.get(log.stream, 0) for log in logs)
+    times = array("d", (log.time for log in logs))
+
+    return b"".join((lengths.tobytes(), streams, times.tobytes(), *texts))
+
+
+def decode_block(data: bytes, count: int) -> tuple[list[str], bytes, array]:
+    """Splits a block back into its text, stream and ingest time columns"""
+    lengths = array("I")
+    lengths.frombytes(data[: count * lengths.itemsize])
+    offset = count * lengths.itemsize
+
+    streams = data[offset : offset + count]
+    offset += count
+
+    times = array("d")
+    times.frombytes(data[offset : offset + count * times.itemsize])
+    offset += count * times.itemsize
+
+    texts = []
+    for length in lengths:
+        texts.append(data[offset : offset + length].decode("utf-8", errors="replace"))
+        offset += length
+
+    return texts, streams, times
+
+
+class ColdStore:
+    """
+    Logs evicted from memory, kept compressed in a session file on disk.
+
+    Evicted logs are collected until there are enough to fill a block, which is then
+    compressed and appended to the file. Only a small index of the blocks is kept in
+    memory, sequence numbers and ingest times of each, so memory use stays the same
+    however long a session goes on. Reading decompresses a block at a time.
+
+    A kept file can be reopened read only with `read_only`, its blocks are indexed
+    without being decompressed.
+    """
+
+    BLOCK_SIZE = 4_096
+
+    def __init__(
+        self,
+        path: str | None = None,
+        block_size: int = BLOCK_SIZE,
+        read_only: bool = False,
+    ) -> None:
+        if block_size < 1:
+            raise ValueError("Block size must be at least 1")
+
+        self.block_size = block_size
+        self.read_only = read_only
+
+        self._lock = threading.Lock()
+        self._blocks: list[ColdBlock] = []
+        self._block_ends: list[int] = []
+        self._pending: list[Log] = []
+
+        self._first_seq: int | None = None
+        self._end_seq = 0
+
+        # a temporary session file goes once closed, one asked for is kept
+        self.keep_file = path is not None
+        if path is None:
+            if read_only:
+                raise ValueError("A path is needed to read a spill file")
+
+            fd, path = tempfile.mkstemp(prefix="logsift-", suffix=".cold")
+            os.close(fd)
+
+        self.path = path
+        self._file: BinaryIO
+
+        if read_only:
+            self._file = open(path, "rb")
+            if self._file.read(len(_FILE_MAGIC)) != _FILE_MAGIC:
+                self._file.close()
+                raise ValueError(f"{path} is not a LogSift spill file")
+
+            self._read_index()
+            return
+
+        # a kept file is never written over, a temporary one was just made empty
+        self._file = open(path, "x+b" if self.keep_file else "w+b")
+        self._file.write(_FILE_MAGIC)
+        self._disk_usage = len(_FILE_MAGIC)
+
+    @property
+    def first_seq(self) -> int:
+        return self._end_seq if self._first_seq is None else self._first_seq
+
+    @property
+    def end_seq(self) -> int:
+        """Sequence number after the newest log held"""
+        return self._end_seq
+
+    @property
+    def disk_usage(self) -> int:
+        return self._disk_usage
+
+    @property
+    def pending(self) -> int:
+        """Logs held in memory until there are enough for a block"""
+        return len(self._pending)
+
+    @property
+    def on_disk(self) -> int:
+        """Logs written out to the file, the ones pending aren't"""
+        return len(self) - self.pending
+
+    def __len__(self) -> int:
+        return self._end_seq - self.first_seq
+
+    def add(self, logs: Iterable[Log]) -> None:
+        """Keeps logs evicted from memory, oldest first"""
+        if self.read_only:
+            raise ValueError("Can't add logs to a spill file opened read only")
+
+        with self._lock:
+            for log in logs:
+                if self._first_seq is None:
+                    self._first_seq = log.seq
+
+                self._pending.append(log)
+                self._end_seq = log.seq + 1
+
+                if len(self._pending) >= self.block_size:
+                    self._write_block(self._pending)
+                    self._pending = []
+
+    def flush(self) -> None:
+        """Writes logs waiting for a full block out anyway"""
+        with self._lock:
+            if len(self._pending) > 0:
+                self._write_block(self._pending)
+                self._pending = []
+
+            self._file.flush()
+
+    def _write_block(self, logs: list[Log]) -> None:
+        codec, payload = _compress(encode_block(logs))
+        header = _BLOCK_HEADER.pack(
+            codec,
+            logs[0].seq,
+            len(logs),
+            logs[0].time,
+            logs[-1].time,
+            len(payload),
+        )
+
+        offset = self._file.seek(0, os.SEEK_END)
+        self._file.write(header + payload)
+        self._disk_usage = offset + len(header) + len(payload)
+
+        block = ColdBlock(
+            offset + _BLOCK_HEADER.size,
+            len(payload),
+            codec,
+            logs[0].seq,
+            len(logs),
+            logs[0].time,
+            logs[-1].time,
+        )
+        self._blocks.append(block)
+        self._block_ends.append(block.end_seq)
+
+    def _read_index(self) -> None:
+        size = os.fstat(self._file.fileno()).st_size
+        offset = len(_FILE_MAGIC)
+
+        while offset + _BLOCK_HEADER.size <= size:
+            self._file.seek(offset)
+            codec, first_seq, count, first_time, last_time, block_size = (
+                _BLOCK_HEADER.unpack(self._file.read(_BLOCK_HEADER.size))
+            )
+
+            offset += _BLOCK_HEADER.size
+            if offset + block_size > size:
+                # cut short while being written, the logs in it are lost
+                break
+
+            block = ColdBlock(
+                offset, block_size, codec, first_seq, count, first_time, last_time
+            )
+            self._blocks.append(block)
+            self._block_ends.append(block.end_seq)
+            offset += block_size
+
+        if len(self._blocks) > 0:
+            self._first_seq = self._blocks[0].first_seq
+            self._end_seq = self._blocks[-1].end_seq
+
+        self._disk_usage = size
+
+    def _read_columns(self, block: ColdBlock) -> tuple[list[str], bytes, array]:
+        with self._lock:
+            self._file.seek(block.offset)
+            data = self._file.read(block.size)
+
+        return decode_block(_decompress(block.codec, data), block.line_count)
+
+    def _snapshot(
+        self, start_seq: int, end_seq: int
+    ) -> tuple[list[ColdBlock], list[Log]]:
+        with self._lock:
+            first = bisect.bisect_right(self._block_ends, start_seq)
+            blocks = []
+            for block in self._blocks[first:]:
+                if block.first_seq >= end_seq:
+                    break
+                blocks.append(block)
+
+            pending = [log for log in self._pending if start_seq <= log.seq < end_seq]
+
+        return blocks, pending
+
+    def iter_logs(
+        self, start_seq: int = 0, end_seq: int | None = None
+    ) -> Iterator[Log]:
+        """Logs between two sequence numbers, oldest first, a block at a time"""
+        if end_seq is None:
+            end_seq = self._end_seq
+
+        blocks, pending = self._snapshot(start_seq, end_seq)
+        for block in blocks:
+            texts, streams, times = self._read_columns(block)
+
+            first = max(start_seq, block.first_seq) - block.first_seq
+            last = min(end_seq, block.end_seq) - block.first_seq
+            for index in range(first, last):
+                yield self._build_log(block, index, texts, streams, times)
+
+        yield from pending
+
+    def search(
+        self, compiled: CompiledFilter, start_seq: int = 0, end_seq: int | None = None
+    ) -> Iterator[list[Log]]:
+        """
+        Logs matching the filter between two sequence numbers, yielded a block at a
+        time. Only matching logs are rebuilt, the rest are checked as plain text
+        """
+        if end_seq is None:
+            end_seq = self._end_seq
+
+        hidden = {Streams.INDEX[stream] for stream in compiled.hidden_streams}
+
+        blocks, pending = self._snapshot(start_seq, end_seq)
+        for block in blocks:
+            texts, streams, times = self._read_columns(block)
+
+            first = max(start_seq, block.first_seq) - block.first_seq
+            last = min(end_seq, block.end_seq) - block.first_seq
+            yield [
+                self._build_log(block, index, texts, streams, times)
+                for index in range(first, last)
+                if streams[index] not in hidden and compiled.match(texts[index])
+            ]
+
+        if len(pending) > 0:
+            yield [log for log in pending if compiled.match_log(log)]
+
+    def _build_log(
+        self,
+        block: ColdBlock,
+        index: int,
+        texts: list[str],
+        streams: bytes,
+        times: array,
+    ) -> Log:
+        log = Log(texts[index], Streams.ALL[streams[index]], ingest_time=times[index])
+        log.seq = block.first_seq + index
+        return log
+
+    def close(self) -> None:
+        if self.keep_file and not self.read_only:
+            self.flush()
+
+        with self._lock:
+            self._file.close()
+
+        if not self.keep_file:
+            os.remove(self.path)
@@ -0,0 +1,173 @@
+import time
+from collections.abc import Callable, Sequence
+from rich.console import Console
+from rich.errors import MarkupError
+from rich.highlighter import ReprHighlighter
+from rich.text import Text
+from textual.cache import LRUCache
+from textual.geometry import Size
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
+from logsift.log import Log
+
+_highlighter = ReprHighlighter()
+
+
+def format_text(content: str) -> Text:
+    """A log line as shown, its markup applied and its reprs highlighted"""
+    try:
+        text = Text.from_markup(content)
+    except MarkupError:
+        text = Text(content)
+
+    _highlighter.highlight(text)
+    return text
+
+
+def render_text(text: Text, console: Console, width: int, wrap: bool) -> list[Strip]:
+    """The rows a formatted log takes up, a single one unless wrapping"""
+    if wrap:
+        lines = text.wrap(console, max(width, 1))
+        return [Strip(line.render(console), line.cell_len) for line in lines]
+
+    text.no_wrap = True
+    return [Strip(text.render(console), text.cell_len)]
+
+
+class LogView(ScrollView, can_focus=True):
+    """
+    Shows a sequence of logs, rendering only the rows in the viewport.
+
+    The logs are read straight from the sequence given, usually the log store or
+    the filtered logs, so scrolling through the whole history costs the same as
+    showing the last screen of it. When word wrapping, a log can span several rows
+    and the vertical scroll offset is the index of the first log shown instead.
+    """
+
+    DEFAULT_CSS = """
+        LogView {
+            background: $surface;
+        }
+    """
+
+    # rendered logs kept around for scrolling back and forth
+    CACHE_SIZE = 2_000
+
+    def __init__(
+        self,
+        formatter: Callable[[Log], str | Text],
+        *,
+        wrap: bool = False,
+        auto_scroll: bool = True,
+        id: str | None = None,
+        classes: str | None = None,
+    ) -> None:
+        super().__init__(id=id, classes=classes)
+
+        self.formatter = formatter
+        self.wrap = wrap
+        self.auto_scroll = auto_scroll
+
+        self._logs: Sequence[Log] = ()
+        self._max_width = 0
+
+        self._cache: LRUCache[tuple[int, int, bool], list[Strip]] = LRUCache(
+            self.CACHE_SIZE
+        )
+        self._rows: list[Strip] | None = None
+        self._rows_key: tuple | None = None
+
+        # told how long rendering the rows on screen took
+        self.render_callback: Callable[[float], None] | None = None
+
+    @property
+    def logs(self) -> Sequence[Log]:
+        return self._logs
+
+    def set_logs(self, logs: Sequence[Log], clear_cache: bool = False) -> None:
+        """
+        Shows `logs`, which may have changed since last shown. Clear the cache when
+        already shown logs would now be formatted differently
+        """
+        if clear_cache:
+            self._cache.clear()
+            self._max_width = 0
+
+        self._logs = logs
+        self._rows = None
+
+        self._update_virtual_size()
+        if self.auto_scroll:
+            self.scroll_to(y=self.max_scroll_y, animate=False)
+
+        self.refresh()
+
+    def _update_virtual_size(self) -> None:
+        width = self.size.width if self.wrap else max(self._max_width, self.size.width)
+        self.virtual_size = Size(width, len(self._logs))
+
+    def _render_log(self, log: Log, width: int) -> list[Strip]:
+        key = (log.seq, width if self.wrap else 0, self.wrap)
+
+        strips = self._cache.get(key)
+        if strips is not None:
+            return strips
+
+        content = self.formatter(log)
+        text = format_text(content) if isinstance(content, str) else content
+
+        strips = render_text(text, self.app.console, width, self.wrap)
+
+        if not self.wrap and text.cell_len > self._max_width:
+            self._max_width = text.cell_len
+            self.call_later(self._update_virtual_size)
+
+        self._cache[key] = strips
+        return strips
+
+    def _build_rows(self, width: int, height: int) -> list[Strip]:
+        logs = self._logs
+        rows: list[Strip] = []
+
+        scroll_y = self.scroll_offset.y
+        if scroll_y >= self.max_scroll_y:
+            # at the bottom the last log is shown last, however many rows logs take
+            index = len(logs) - 1
+            while index >= 0 and len(rows) < height:
+                rows[0:0] = self._render_log(logs[index], width)
+                index -= 1
+
+            return rows[-height::] if len(rows) > height else rows
+
+        index = scroll_y
+        while index < len(logs) and len(rows) < height:
+            rows.extend(self._render_log(logs[index], width))
+            index += 1
+
+        return rows[:height]
+
+    def render_line(self, y: int) -> Strip:
+        scroll_x, scroll_y = self.scroll_offset
+        width, height = self.size
+
+        key = (scroll_x, scroll_y, width, height, len(self._logs), self.wrap)
+        if self._rows is None or key != self._rows_key:
+            start = time.perf_counter()
+            self._rows = self._build_rows(width, height)
+            self._rows_key = key
+
+            if self.render_callback is not None:
+                self.render_callback(time.perf_counter() - start)
+
+        style = self.rich_style
+        if y >= len(self._rows):
+            return Strip.blank(width, style)
+
+        row = self._rows[y]
+        if not self.wrap:
+            row = row.crop_extend(scroll_x, scroll_x + width, style)
+
+        return row.apply_style(style)
+
+    def on_resize(self) -> None:
+        self.set_logs(self._logs)
@@ -0,0 +1,52 @@
+from textual.app import ComposeResult
+from textual.widgets import Label, Static
+from logsift.components.title import Title
+from logsift.metrics import MetricsSnapshot, format_bytes
+
+
+class MetricsPanel(Static):
+    DEFAULT_CSS = """
+        MetricsPanel {
+            padding: 1;
+            width: 40;
+            height: auto;
+            background: $panel;
+            layer: above;
+            dock: left;
+        }
+
+        #metrics-body {
+            width: 100%;
+        }
+    """
+
+    def compose(self) -> ComposeResult:
+        yield Title("Performance", variant="h1", padding=False)
+        yield Label("Waiting for the first sample", id="metrics-body")
+
+    def update_snapshot(self, snapshot: MetricsSnapshot) -> None:
+        backlog = "unknown"
+        if snapshot.backlog_bytes is not None:
+            backlog = format_bytes(snapshot.backlog_bytes)
+
+        refilter = "-"
+        if snapshot.refilter_ms is not None:
+            refilter = f"{snapshot.refilter_ms:,.1f} ms"
+
+        lines = (
+            f"Ingest     {snapshot.ingest_rate:>10,.0f} logs/s",
+            f"Backlog    {backlog:>10}",
+            f"Buffered   {snapshot.buffered:>10,}",
+            f"Dropped    {snapshot.dropped:>10,}",
+            f"Refilter   {refilter:>10}",
+            f"Frame      {snapshot.frame_ms:>10,.1f} ms",
+            f"Render     {snapshot.render_ms:>10,.1f} ms (max {snapshot.render_max_ms:,.1f})",
+            f"Frames     {snapshot.frames_per_second:>10,.1f} /s",
+            f"Stored     {snapshot.stored:>10,} logs",
+            f"Store      {format_bytes(snapshot.store_bytes):>10}",
+            f"Evicted    {snapshot.evicted:>10,}",
+        )
+
+        label = self.query_one("#metrics-body", Label)
+        label._renderable = "\n".join(lines)
+        label.refresh(layout=True)
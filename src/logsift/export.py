@@ -0,0 +1,101 @@
+import os
+import shutil
+import subprocess
+import sys
+from collections.abc import Callable, Iterable
+from itertools import islice
+from typing import BinaryIO
+from logsift.log import Log
+
+# logs encoded and written at once, big enough to keep writes few but small enough
+# that a huge export never holds more than a sliver of itself in memory
+CHUNK_SIZE = 2_000
+
+
+def write_logs(
+    logs: Iterable[Log],
+    output: BinaryIO,
+    chunk_size: int = CHUNK_SIZE,
+    progress: Callable[[int], None] | None = None,
+    cancelled: Callable[[], bool] | None = None,
+) -> int:
+    """Writes logs a line each, a chunk at a time, returning how many were written"""
+    logs = iter(logs)
+    written = 0
+
+    while cancelled is None or not cancelled():
+        chunk = list(islice(logs, chunk_size))
+        if len(chunk) == 0:
+            break
+
+        output.write(
+            "".join(f"{log}\n" for log in chunk).encode("utf-8", errors="replace")
+        )
+        written += len(chunk)
+
+        if progress is not None:
+            progress(written)
+
+    output.flush()
+    return written
+
+
+def clipboard_command() -> list[str] | None:
+    """Command which copies its stdin to the clipboard, None when there isn't one"""
+    if sys.platform == "darwin":
+        candidates = [["pbcopy"]]
+    elif sys.platform == "win32":
+        candidates = [["clip"]]
+    else:
+        candidates = [["xclip", "-selection", "clipboard"], ["xsel", "-ib"]]
+        if "WAYLAND_DISPLAY" in os.environ:
+            candidates.insert(0, ["wl-copy"])
+
+    for command in candidates:
+        if shutil.which(command[0]) is not None:
+            return command
+
+    return None
+
+
+def copy_logs(
+    logs: Iterable[Log],
+    progress: Callable[[int], None] | None = None,
+    cancelled: Callable[[], bool] | None = None,
+) -> int:
+    """Streams logs into the clipboard command, returning how many were copied"""
+    command = clipboard_command()
+    if command is None:
+        raise RuntimeError(f"No clipboard command found for {sys.platform=}")
+
+    process = subprocess.Popen(
+        command,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        written = write_logs(
+            logs, process.stdin, progress=progress, cancelled=cancelled  # type: ignore[arg-type]
+        )
+    except BaseException:
+        process.kill()
+        raise
+    finally:
+        process.stdin.close()  # type: ignore[union-attr]
+
+    if process.wait() != 0:
+        raise RuntimeError(f"{command[0]} exited with {process.returncode}")
+
+    return written
+
+
+def save_logs(
+    path: str,
+    logs: Iterable[Log],
+    progress: Callable[[int], None] | None = None,
+    cancelled: Callable[[], bool] | None = None,
+) -> int:
+    """Streams logs into a file, returning how many were saved"""
+    with open(path, "wb") as file:
+        return write_logs(logs, file, progress=progress, cancelled=cancelled)
@@ -0,0 +1,139 @@
+import json
+import re
+from collections.abc import Callable
+from typing import NamedTuple
+
+try:
+    import orjson
+except ImportError:  # optional, see the "fast" extra
+    orjson = None  # type: ignore[assignment]
+
+# field name to its value as it would be typed in a filter, nested keys are dotted
+FieldMap = dict[str, str]
+
+_LOGFMT_START = re.compile(r"[\w.\-/]+=")
+_LOGFMT_PAIR = re.compile(r'(?:^|\s)([\w.\-/]+)=("(?:[^"\\]|\\.)*"|\S*)')
+
+
+def _loads(text: str) -> object:
+    if orjson is not None:
+        return orjson.loads(text)
+
+    return json.loads(text)
+
+
+def _scalar(value: object) -> str:
+    # as written in JSON, e.g. 500, true, null
+    if isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if value is None:
+        return "null"
+    if isinstance(value, (int, float)):
+        return repr(value)
+
+    return json.dumps(value)
+
+
+def _flatten(value: dict, prefix: str, fields: FieldMap) -> None:
+    for key, item in value.items():
+        if isinstance(item, dict):
+            _flatten(item, f"{prefix}{key}.", fields)
+        else:
+            fields[f"{prefix}{key}"] = _scalar(item)
+
+
+def sniff_json(text: str) -> bool:
+    return text.startswith("{") and text.endswith("}")
+
+
+def parse_json(text: str) -> FieldMap | None:
+    try:
+        value = _loads(text)
+    except ValueError:
+        return None
+
+    if not isinstance(value, dict):
+        return None
+
+    fields: FieldMap = {}
+    _flatten(value, "", fields)
+    return fields
+
+
+def sniff_logfmt(text: str) -> bool:
+    return _LOGFMT_START.match(text) is not None
+
+
+def parse_logfmt(text: str) -> FieldMap | None:
+    fields: FieldMap = {}
+    for key, value in _LOGFMT_PAIR.findall(text):
+        if value.startswith('"') and len(value) >= 2:
+            value = value[1:-1].replace('\\"', '"')
+
+        fields[key] = value
+
+    return fields if len(fields) > 0 else None
+
+
+class FieldFormat(NamedTuple):
+    name: str
+    # cheap check of whether a line could be in this format
+    sniff: Callable[[str], bool]
+    parse: Callable[[str], FieldMap | None]
+
+
+FORMATS: tuple[FieldFormat, ...] = (
+    FieldFormat("json", sniff_json, parse_json),
+    FieldFormat("logfmt", sniff_logfmt, parse_logfmt),
+)
+
+
+class FieldParser:
+    """
+    Reads the fields of structured log lines.
+
+    The format a stream's logs were last parsed as is remembered and tried first,
+    logs from one source almost always share a format. The other formats are only
+    sniffed when a line doesn't fit it. More formats can be registered.
+    """
+
+    def __init__(self, formats: tuple[FieldFormat, ...] = FORMATS) -> None:
+        self._formats = list(formats)
+        self._stream_formats: dict[str | None, FieldFormat] = {}
+
+    @property
+    def formats(self) -> tuple[FieldFormat, ...]:
+        return tuple(self._formats)
+
+    def register(self, format_: FieldFormat) -> None:
+        self._formats.append(format_)
+
+    def parse(self, text: str, stream: str | None = None) -> FieldMap | None:
+        """Fields of a structured line, None when the line is in no known format"""
+        text = text.strip()
+
+        known = self._stream_formats.get(stream)
+        if known is not None and known.sniff(text):
+            fields = known.parse(text)
+            if fields is not None:
+                return fields
+
+        for format_ in self._formats:
+            if format_ is known or not format_.sniff(text):
+                continue
+
+            fields = format_.parse(text)
+            if fields is not None:
+                self._stream_formats[stream] = format_
+                return fields
+
+        return None
+
+
+default_parser = FieldParser()
+
+
+def parse_fields(text: str, stream: str | None = None) -> FieldMap | None:
+    return default_parser.parse(text, stream)
@@ -0,0 +1,281 @@
+import bisect
+import threading
+from collections import OrderedDict
+from logsift.filter_terms import PatternTerm
+from logsift.filtering import CompiledFilter
+from logsift.log import Log
+from logsift.log_store import LogStore
+from logsift.parallel import ParallelFilter
+from logsift.trigram_index import TrigramIndex
+
+
+def _term_implies(
+    term: tuple[bool, str | PatternTerm], other: tuple[bool, str | PatternTerm]
+) -> bool:
+    positive, value = term
+    other_positive, other_value = other
+
+    if not isinstance(value, str) or not isinstance(other_value, str):
+        # regexes and fields are only known to imply themselves
+        return positive == other_positive and value == other_value
+
+    if positive and other_positive:
+        return other_value in value
+
+    if not positive and not other_positive:
+        return value in other_value
+
+    return False
+
+
+def narrows(new: CompiledFilter, old: CompiledFilter) -> bool:
+    """True when every log matched by `new` is also matched by `old`"""
+    if new.case_insensitive != old.case_insensitive:
+        return False
+
+    if not new.hidden_streams >= old.hidden_streams:
+        return False
+
+    if not old.has_terms:
+        return True
+
+    if not new.has_terms:
+        return False
+
+    new_terms, old_terms = new.prepared_terms, old.prepared_terms
+
+    # with a single term "all" and "any" mean the same thing
+    new_all = new.match_all or len(new_terms) == 1
+    new_any = not new.match_all or len(new_terms) == 1
+    old_all = old.match_all or len(old_terms) == 1
+    old_any = not old.match_all or len(old_terms) == 1
+
+    if old_all and new_all:
+        if all(any(_term_implies(n, o) for n in new_terms) for o in old_terms):
+            return True
+
+    if old_any and new_any:
+        if all(any(_term_implies(n, o) for o in old_terms) for n in new_terms):
+            return True
+
+    if old_any and new_all:
+        if any(_term_implies(n, o) for n in new_terms for o in old_terms):
+            return True
+
+    return False
+
+
+class FilterResult:
+    __slots__ = ("compiled", "logs", "end_seq")
+
+    def __init__(self, compiled: CompiledFilter, logs: list[Log], end_seq: int) -> None:
+        self.compiled = compiled
+        # ordered by seq, covers every stored log with a seq below end_seq
+        self.logs = logs
+        self.end_seq = end_seq
+
+    def drop_evicted(self, first_seq: int, copy: bool = False) -> None:
+        """Drops logs older than the oldest one stored"""
+        first = bisect.bisect_left(self.logs, first_seq, key=lambda log: log.seq)
+        if first == 0:
+            return
+
+        if copy:
+            self.logs = self.logs[first::]
+        else:
+            del self.logs[:first]
+
+    def add(self, logs: list[Log], copy: bool = False) -> None:
+        """Appends newly matched logs"""
+        if len(logs) == 0:
+            return
+
+        if copy:
+            self.logs = self.logs + logs
+        else:
+            self.logs.extend(logs)
+
+
+class FilterCache:
+    """
+    Filters the log store, reusing earlier results where possible.
+
+    The last few results are kept, when the new filter narrows one of them (e.g. a
+    term was extended or added in "match all" mode) only that result is rescanned.
+    When it widens one, the logs already known to match are not checked again.
+    Otherwise the trigram index, when there is one, narrows down what is scanned.
+    """
+
+    MAX_RESULTS = 8
+
+    def __init__(self, parallel: ParallelFilter | None = None) -> None:
+        self._results: OrderedDict[tuple, FilterResult] = OrderedDict()
+        self._parallel = parallel
+        self.index: TrigramIndex | None = None
+
+        # filtering happens both in refilter workers and on ingest
+        self._lock = threading.Lock()
+
+    def trim(self, store: LogStore) -> None:
+        """
+        Drops logs the store has evicted from every result, so they aren't kept alive.
+        Skipped while a filter is running, which trims every result once done.
+        """
+        if not self._lock.acquire(blocking=False):
+            return
+
+        try:
+            self._trim(store.first_seq)
+        finally:
+            self._lock.release()
+
+    def shutdown(self) -> None:
+        if self._parallel is not None:
+            self._parallel.shutdown()
+
+    def filter(
+        self, compiled: CompiledFilter, store: LogStore, copy: bool = False
+    ) -> list[Log]:
+        """
+        Logs in the store matching `compiled`. The list is kept and updated in place
+        by later calls, see `update`.
+
+        With `copy` no list returned earlier is changed, the results it would change
+        are copied instead. Used when filtering away from the thread showing them.
+        """
+        with self._lock:
+            return self._filter(compiled, store, copy)
+
+    def update(self, compiled: CompiledFilter, store: LogStore) -> list[Log] | None:
+        """
+        Brings the result for `compiled` up to date with the store, only matching logs
+        stored since. Returns None when there is no result for it yet, or while
+        another filter is running, building one is left to `filter`.
+        """
+        if not self._lock.acquire(blocking=False):
+            return None
+
+        try:
+            result = self._results.get(compiled.key)
+            if result is None:
+                return None
+
+            self._update(result, compiled, store, store.next_seq, copy=False)
+            self._trim(store.first_seq)
+            return result.logs
+        finally:
+            self._lock.release()
+
+    def _filter(
+        self, compiled: CompiledFilter, store: LogStore, copy: bool
+    ) -> list[Log]:
+        end_seq = store.next_seq
+
+        result = self._results.get(compiled.key)
+        if result is None:
+            result = self._build(compiled, store, end_seq, copy)
+        else:
+            self._update(result, compiled, store, end_seq, copy)
+
+        self._results[compiled.key] = result
+        self._results.move_to_end(compiled.key)
+        while len(self._results) > self.MAX_RESULTS:
+            self._results.popitem(last=False)
+
+        self._trim(store.first_seq, copy)
+        return result.logs
+
+    def _trim(self, first_seq: int, copy: bool = False) -> None:
+        for result in self._results.values():
+            result.drop_evicted(first_seq, copy)
+
+    def _build(
+        self, compiled: CompiledFilter, store: LogStore, end_seq: int, copy: bool
+    ) -> FilterResult:
+        narrower = [
+            result
+            for result in self._results.values()
+            if narrows(compiled, result.compiled)
+        ]
+        if len(narrower) > 0:
+            base = min(narrower, key=lambda result: len(result.logs))
+            self._update(base, base.compiled, store, end_seq, copy)
+
+            logs = [log for log in base.logs if compiled.match_log(log)]
+            return FilterResult(compiled, logs, end_seq)
+
+        wider = [
+            result
+            for result in self._results.values()
+            if narrows(result.compiled, compiled)
+        ]
+        if len(wider) > 0:
+            base = max(wider, key=lambda result: len(result.logs))
+            self._update(base, base.compiled, store, end_seq, copy)
+            known = {log.seq for log in base.logs}
+
+            logs = [
+                log
+                for log in self._scan(store, store.first_seq, end_seq)
+                if log.seq in known or compiled.match_log(log)
+            ]
+            return FilterResult(compiled, logs, end_seq)
+
+        if self.index is not None:
+            # logs are stored before they are indexed, the rest is scanned
+            indexed_end = min(self.index.end_seq, end_seq)
+            candidates = self.index.candidates(compiled)
+
+            if candidates is not None:
+                logs = [
+                    log
+                    for seq in candidates
+                    if seq < indexed_end
+                    and (log := store.get(seq)) is not None
+                    and log.seq == seq
+                    and compiled.match_log(log)
+                ]
+                logs.extend(
+                    log
+                    for log in self._scan(store, indexed_end, end_seq)
+                    if compiled.match_log(log)
+                )
+                return FilterResult(compiled, logs, end_seq)
+
+        if self._parallel is not None and self._parallel.should_use(len(store)):
+            snapshot = list(self._scan(store, store.first_seq, end_seq))
+            return FilterResult(
+                compiled, self._parallel.filter(compiled, snapshot), end_seq
+            )
+
+        logs = [
+            log
+            for log in self._scan(store, store.first_seq, end_seq)
+            if compiled.match_log(log)
+        ]
+        return FilterResult(compiled, logs, end_seq)
+
+    def _update(
+        self,
+        result: FilterResult,
+        compiled: CompiledFilter,
+        store: LogStore,
+        end_seq: int,
+        copy: bool,
+    ) -> None:
+        """Drops evicted logs from a result and matches logs stored since it was made"""
+        result.drop_evicted(store.first_seq, copy)
+        result.add(
+            [
+                log
+                for log in self._scan(store, result.end_seq, end_seq)
+                if compiled.match_log(log)
+            ],
+            copy,
+        )
+        result.end_seq = end_seq
+
+    def _scan(self, store: LogStore, start_seq: int, end_seq: int):
+        # refilter workers scan while logs are still stored, a slot overwritten by a
+        # newer log is skipped instead of ending the scan, the log it held is evicted
+        return (log for log in store.since(start_seq) if log.seq < end_seq)
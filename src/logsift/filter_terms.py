@@ -0,0 +1,107 @@
+import functools
+import re
+from typing import NamedTuple
+from logsift.fields import FieldMap
+
+_FIELD_TERM = re.compile(r"([\w.\-/]+)=(.*)", re.DOTALL)
+
+
+@functools.lru_cache(maxsize=128)
+def compile_regex(pattern: str, case_insensitive: bool) -> re.Pattern:
+    """Compiled once however many filters use it, invalid patterns match literally"""
+    flags = re.IGNORECASE if case_insensitive else 0
+    try:
+        return re.compile(pattern, flags)
+    except re.error:
+        return re.compile(re.escape(pattern), flags)
+
+
+def is_regex_term(term: str) -> bool:
+    return len(term) >= 2 and term.startswith("/") and term.endswith("/")
+
+
+def is_valid_regex(term: str) -> bool:
+    try:
+        re.compile(term[1:-1])
+    except re.error:
+        return False
+
+    return True
+
+
+class RegexTerm(NamedTuple):
+    """`/pattern/`, matches logs the pattern is found in"""
+
+    pattern: re.Pattern
+
+    def matches(self, line: str, prepared: str, fields: FieldMap | None) -> bool:
+        return self.pattern.search(line) is not None
+
+    def spans(self, line: str, prepared: str) -> list[tuple[int, int]]:
+        return [
+            match.span()
+            for match in self.pattern.finditer(line)
+            if match.end() > match.start()
+        ]
+
+
+class FieldTerm(NamedTuple):
+    """
+    `key=value`, matches JSON and logfmt logs with a field of that value. Logs
+    without fields are searched for the term as it was typed instead
+    """
+
+    key: str
+    value: str
+    source: str
+    case_insensitive: bool
+
+    def matches(self, line: str, prepared: str, fields: FieldMap | None) -> bool:
+        if fields is None:
+            return self.source in prepared
+
+        value = fields.get(self.key)
+        if not self.case_insensitive or value is not None:
+            return value is not None and self._prepare(value) == self.value
+
+        return any(
+            key.lower() == self.key and value.lower() == self.value
+            for key, value in fields.items()
+        )
+
+    def spans(self, line: str, prepared: str) -> list[tuple[int, int]]:
+        term = self.source if self.source in prepared else self.value
+        if len(term) == 0:
+            return []
+
+        spans = []
+        start = prepared.find(term)
+        while start != -1:
+            spans.append((start, start + len(term)))
+            start = prepared.find(term, start + 1)
+
+        return spans
+
+    def _prepare(self, value: str) -> str:
+        return value.lower() if self.case_insensitive else value
+
+
+PatternTerm = RegexTerm | FieldTerm
+
+
+def parse_term(term: str, case_insensitive: bool) -> str | PatternTerm:
+    """
+    Turns a term, without its `!`, into what it matches. Plain terms are returned
+    as they should be searched for, lowercased when case insensitive
+    """
+    if is_regex_term(term):
+        return RegexTerm(compile_regex(term[1:-1], case_insensitive))
+
+    prepared = term.lower() if case_insensitive else term
+
+    match = _FIELD_TERM.fullmatch(prepared)
+    if match is not None:
+        key, value = match.groups()
+        return FieldTerm(key, value, prepared, case_insensitive)
+
+    return prepared
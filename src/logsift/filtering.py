@@ -1,4 +1,185 @@
+import functools
+from rich.markup import escape
+from logsift.fields import FieldMap, parse_fields
+from logsift.filter_terms import (
+    FieldTerm,
+    PatternTerm,
+    is_regex_term,
+    is_valid_regex,
+    parse_term,
+)
+from logsift.log import Log
+from logsift.matching import TermMatcher
 from logsift.term_decoder import TermDecoder
+from logsift.types.streams import Streams
+
+
+class CompiledFilter:
+    """A filter decoded once up front, so matching a log is a single tight loop"""
+
+    def __init__(
+        self,
+        terms: tuple[str, ...],
+        case_insensitive: bool,
+        match_all: bool,
+        hidden_streams: frozenset[str],
+        active: bool,
+    ) -> None:
+        self.terms = terms
+        self.case_insensitive = case_insensitive
+        self.match_all = match_all
+        self.hidden_streams = hidden_streams
+
+        positive = [
+            parse_term(term, case_insensitive)
+            for term in terms
+            if not term.startswith("!")
+        ]
+        negative = [
+            parse_term(term[1::], case_insensitive)
+            for term in terms
+            if term.startswith("!")
+        ]
+
+        # plain terms are substrings, the rest (regexes, fields) are checked after them
+        self.positive = tuple(term for term in positive if isinstance(term, str))
+        self.negative = tuple(term for term in negative if isinstance(term, str))
+        self.positive_patterns: tuple[PatternTerm, ...] = tuple(
+            term for term in positive if not isinstance(term, str)
+        )
+        self.negative_patterns: tuple[PatternTerm, ...] = tuple(
+            term for term in negative if not isinstance(term, str)
+        )
+        self.has_patterns = (
+            len(self.positive_patterns) + len(self.negative_patterns) > 0
+        )
+        self.needs_fields = any(
+            isinstance(term, FieldTerm)
+            for term in (*self.positive_patterns, *self.negative_patterns)
+        )
+
+        # "any of these terms" questions are answered by a single scan of the line,
+        # "all of these terms" short circuits on the first missing term instead
+        self._positive_matcher = TermMatcher(self.positive)
+        self._negative_matcher = TermMatcher(self.negative)
+
+        # (is positive, prepared term) pairs, used to compare filters with each other
+        self.prepared_terms: tuple[tuple[bool, str | PatternTerm], ...] = (
+            *((True, term) for term in positive),
+            *((False, term) for term in negative),
+        )
+        self.key = (terms, case_insensitive, match_all, hidden_streams, active)
+
+        self.has_terms = len(terms) > 0
+        self.disabled = not active or (not self.has_terms and len(hidden_streams) == 0)
+
+    def match_log(self, log: Log) -> bool:
+        if self.disabled:
+            return True
+
+        if log.stream in self.hidden_streams:
+            return False
+
+        return self._match(log.text, log)
+
+    def match(self, log_line: str) -> bool:
+        return self._match(log_line, None)
+
+    def _fields(self, log_line: str, log: Log | None) -> FieldMap | None:
+        if not self.needs_fields:
+            return None
+
+        # memoised on the log, so filtering it again doesn't parse it again
+        return log.fields if log is not None else parse_fields(log_line)
+
+    def _match(self, log_line: str, log: Log | None) -> bool:
+        if self.disabled or not self.has_terms:
+            return True
+
+        line = log_line.lower() if self.case_insensitive else log_line
+
+        if self.match_all:
+            if not all(
+                term in line for term in self.positive
+            ) or self._negative_matcher.any(line):
+                return False
+
+            if not self.has_patterns:
+                return True
+
+            fields = self._fields(log_line, log)
+            return all(
+                term.matches(log_line, line, fields) for term in self.positive_patterns
+            ) and not any(
+                term.matches(log_line, line, fields) for term in self.negative_patterns
+            )
+
+        if self._positive_matcher.any(line) or any(
+            term not in line for term in self.negative
+        ):
+            return True
+
+        if not self.has_patterns:
+            return False
+
+        fields = self._fields(log_line, log)
+        return any(
+            term.matches(log_line, line, fields) for term in self.positive_patterns
+        ) or any(
+            not term.matches(log_line, line, fields) for term in self.negative_patterns
+        )
+
+    def match_spans(self, log_line: str) -> list[tuple[int, int]]:
+        """(start, end) spans of the positive terms found in the line, merged"""
+        line = log_line.lower() if self.case_insensitive else log_line
+
+        spans = []
+        for pattern in self.positive_patterns:
+            if not isinstance(pattern, FieldTerm):
+                spans.extend(pattern.spans(log_line, line))
+
+        # lowercasing changed the length, offsets into the line wouldn't line up
+        if len(line) == len(log_line):
+            for pattern in self.positive_patterns:
+                if isinstance(pattern, FieldTerm):
+                    spans.extend(pattern.spans(log_line, line))
+
+            for term in self.positive:
+                if len(term) == 0:
+                    continue
+
+                start = line.find(term)
+                while start != -1:
+                    spans.append((start, start + len(term)))
+                    start = line.find(term, start + 1)
+
+        spans.sort()
+
+        merged: list[tuple[int, int]] = []
+        for start, end in spans:
+            if len(merged) > 0 and start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(end, merged[-1][1]))
+            else:
+                merged.append((start, end))
+
+        return merged
+
+
+@functools.lru_cache(maxsize=64)
+def compile_filter(
+    filter_: str,
+    case_insensitive: bool,
+    match_all: bool,
+    hidden_streams: frozenset[str],
+    active: bool,
+) -> CompiledFilter:
+    return CompiledFilter(
+        tuple(FilterManager.decode_filter(filter_)),
+        case_insensitive,
+        match_all,
+        hidden_streams,
+        active,
+    )
 
 
 class FilterManager:
@@ -10,29 +191,53 @@ class FilterManager:
         self._filter_active: bool = True
         self._case_insensitive: bool = True
         self._match_all: bool = False
+        self._hidden_streams: set[str] = set()
+
+        self._compiled = self._compile()
+
+    @property
+    def compiled(self) -> CompiledFilter:
+        return self._compiled
+
+    @property
+    def has_terms(self) -> bool:
+        return self._compiled.has_terms
 
     @property
     def is_disabled(self) -> bool:
-        return (
-            not self._filter_active
-            or self.filter == ""
-            or len(self.decode()) == 0
-            or self.decode()[0] == ""
+        return self._compiled.disabled
+
+    def _compile(self) -> CompiledFilter:
+        return compile_filter(
+            self._filter,
+            self._case_insensitive,
+            self._match_all,
+            frozenset(self._hidden_streams),
+            self._filter_active,
         )
 
+    def _recompile(self) -> None:
+        self._compiled = self._compile()
+
     @property
     def filter(self):
         return self._filter
 
     def validate(self, override_filter: str | None = None) -> bool:
         try:
-            self.decoder.run(override_filter or self.filter)
-            return True
+            terms = self.decoder.run(override_filter or self.filter)
         except ValueError:
             return False
 
+        return all(
+            is_valid_regex(term.removeprefix("!"))
+            for term in terms
+            if is_regex_term(term.removeprefix("!"))
+        )
+
     def set_filter(self, filter_: str) -> bool:
         self._filter = filter_
+        self._recompile()
         return self.validate()
 
     @property
@@ -41,6 +246,7 @@ class FilterManager:
 
     def set_match_all(self, value: bool) -> None:
         self._match_all = value
+        self._recompile()
 
     @property
     def filter_active(self) -> bool:
@@ -51,6 +257,7 @@ class FilterManager:
         if not isinstance(value, bool):
             raise ValueError("Filter active must be a boolean")
         self._filter_active = value
+        self._recompile()
 
     @property
     def case_insensitive(self) -> bool:
@@ -61,19 +268,35 @@ class FilterManager:
         if not isinstance(value, bool):
             raise ValueError("Case insensitive must be a boolean")
         self._case_insensitive = value
+        self._recompile()
+
+    def is_stream_shown(self, stream: str) -> bool:
+        return stream not in self._hidden_streams
+
+    def set_stream_shown(self, stream: str, value: bool) -> None:
+        if value:
+            self._hidden_streams.discard(stream)
+        else:
+            self._hidden_streams.add(stream)
+
+        self._recompile()
 
     def handle_case_sensitivity(self, value: str) -> str:
         return value.lower() if self.case_insensitive else value
 
-    def decode(self) -> list[str]:
+    @classmethod
+    def decode_filter(cls, filter_: str) -> list[str]:
         terms = []
         try:
-            terms = self.decoder.run(self.filter)
+            terms = cls.decoder.run(filter_)
         except ValueError:
-            terms = self.decoder.run(self.filter + '"')
+            terms = cls.decoder.run(filter_ + '"')
 
         return terms
 
+    def decode(self) -> list[str]:
+        return list(self._compiled.terms)
+
     def build_explanation(self) -> str:
         terms = self.decode()
         explanation = ["Matches any log that contains: "]
@@ -86,26 +309,32 @@ class FilterManager:
             color = "green" if inverse == "" else "red"
             term = term if inverse == "" else term[1::]
 
-            explanation.append(f"{inverse}[{color}]`{term}`[/{color}]")
-            explanation.append(joiner)
-
-        return " ".join(explanation[:-1:])
+            described = f"`{escape(term)}`"
+            if is_regex_term(term):
+                described = f"a match for `{escape(term)}`"
+            elif isinstance(parse_term(term, False), FieldTerm):
+                key, _, value = term.partition("=")
+                described = f"`{escape(key)}` set to `{escape(value)}`"
 
-    def match(self, log_line: str) -> bool:
-        if self.is_disabled:
-            return True
+            explanation.append(f"{inverse}[{color}]{described}[/{color}]")
+            explanation.append(joiner)
 
-        terms = self.decode()
+        explanation = explanation[:-1:]
 
-        def _match_term(term: str) -> bool:
-            inverted = term.startswith("!")
-            matcher = self.handle_case_sensitivity(term[1::] if inverted else term)
+        if len(self._hidden_streams) > 0:
+            shown = [
+                stream
+                for stream in (Streams.STDOUT, Streams.STDERR)
+                if self.is_stream_shown(stream)
+            ]
 
-            value = matcher in self.handle_case_sensitivity(log_line)
+            explanation = explanation or ["Matches any log"]
+            explanation.append(f"from {' or '.join(shown) or 'no stream'}")
 
-            return (not value) if inverted else value
+        return " ".join(explanation)
 
-        if self.match_all:
-            return all(map(_match_term, terms))
+    def match_log(self, log: Log) -> bool:
+        return self._compiled.match_log(log)
 
-        return any(map(_match_term, terms))
+    def match(self, log_line: str) -> bool:
+        return self._compiled.match(log_line)
@@ -0,0 +1,40 @@
+import asyncio
+import time
+from collections.abc import Callable
+
+
+class FrameScheduler:
+    """
+    Coalesces requests to redraw, calling `callback` at most `fps` times a second.
+
+    Requests made while a frame is pending are folded into it, so a burst of ingested
+    batches costs a single redraw. Only to be used from the event loop's thread.
+    """
+
+    def __init__(self, callback: Callable[[], None], fps: float = 30) -> None:
+        if fps <= 0:
+            raise ValueError("Frames per second must be positive")
+
+        self._callback = callback
+        self._interval = 1 / fps
+
+        self._last_frame = 0.0
+        self._handle: asyncio.TimerHandle | None = None
+
+    def request(self) -> None:
+        if self._handle is not None:
+            return
+
+        delay = max(0.0, self._last_frame + self._interval - time.monotonic())
+        self._handle = asyncio.get_running_loop().call_later(delay, self._run)
+
+    def cancel(self) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+    def _run(self) -> None:
+        self._handle = None
+        self._last_frame = time.monotonic()
+
+        self._callback()
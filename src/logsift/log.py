@@ -1,33 +1,69 @@
+import sys
 import time
 import datetime
-import dateutil
-import dateutil.parser
+import mmap
+from enum import Enum
+from typing import Final
+from logsift.fields import FieldMap, parse_fields
+from logsift.timestamps import default_extractor
+from logsift.types.streams import Streams
 
 
-class Log:
-    def __init__(self, text: str) -> None:
-        self._text = text
+class NotComputed(Enum):
+    """Marks lazily computed values which have not been computed yet"""
 
-        self._ingest_time = time.time()
-        self._time_ingest_str = datetime.datetime.fromtimestamp(
-            self._ingest_time
-        ).strftime("%H:%M:%S.%f")[:-3]
+    NOT_COMPUTED = "not computed"
 
-        self._prefix = ""
-        self._suffix = ""
 
-        self._stated_timestamp: float | None = None
-        self._extract_data()
+NOT_COMPUTED: Final = NotComputed.NOT_COMPUTED
 
-    def set_prefix(self, value: str):
-        self._prefix = value
 
-    def set_suffix(self, value: str):
-        self._suffix = value
+class Log:
+    __slots__ = (
+        "_text",
+        "_stream",
+        "_ingest_time",
+        "_time_ingest_str",
+        "_stated_timestamp",
+        "_fields",
+        "_seq",
+    )
+
+    def __init__(
+        self,
+        text: str,
+        stream: str = Streams.STDOUT,
+        ingest_time: float | None = None,
+    ) -> None:
+        self._text: str | None = text
+        self._stream = stream
+
+        # given when a log ingested earlier is read back from disk
+        self._ingest_time = time.time() if ingest_time is None else ingest_time
+        self._time_ingest_str: str | None = None
+
+        self._stated_timestamp: float | None | NotComputed = NOT_COMPUTED
+        # only parsed once a filter asks for a field
+        self._fields: FieldMap | None | NotComputed = NOT_COMPUTED
+
+        # given by the LogStore the log ends up in
+        self._seq = -1
 
     @property
     def text(self) -> str:
-        return self._text
+        return self._text  # type: ignore[return-value]
+
+    @property
+    def stream(self) -> str:
+        return self._stream
+
+    @property
+    def seq(self) -> int:
+        return self._seq
+
+    @seq.setter
+    def seq(self, value: int) -> None:
+        self._seq = value
 
     @property
     def time(self) -> float:
@@ -35,31 +71,68 @@ class Log:
         return self._ingest_time
 
     @property
-    def prefix(self) -> str:
-        return self._prefix
+    def time_ingest_str(self) -> str:
+        if self._time_ingest_str is None:
+            self._time_ingest_str = datetime.datetime.fromtimestamp(
+                self._ingest_time
+            ).strftime("%H:%M:%S.%f")[:-3]
+
+        return self._time_ingest_str
+
+    @property
+    def stated_timestamp(self) -> float | None:
+        if self._stated_timestamp is NOT_COMPUTED:
+            self._extract_data()
+
+        # computed by _extract_data, which mypy can't see
+        return self._stated_timestamp  # type: ignore[return-value]
 
     @property
-    def suffix(self) -> str:
-        return self._suffix
+    def fields(self) -> FieldMap | None:
+        """Fields of a JSON or logfmt log, None for any other log"""
+        if self._fields is NOT_COMPUTED:
+            self._fields = parse_fields(self.text, self._stream)
 
-    def copy(self):
-        copied_log = type(self)(self._text)
-        copied_log._ingest_time = self._ingest_time
+        return self._fields
 
-        return copied_log
+    @property
+    def memory_usage(self) -> int:
+        """Bytes held by the log, its text only counts once decoded"""
+        size = sys.getsizeof(self)
+        if self._text is not None:
+            size += sys.getsizeof(self._text)
+
+        return size
 
     def __str__(self) -> str:
-        return f"{self.prefix}{self._text}{self.suffix}"
+        return self.text
 
     def _extract_timestamp(self) -> None:
-        potential_stamps = self.text.split(" ")
-        for stamp in potential_stamps:
-            try:
-                dt = dateutil.parser.isoparse(stamp).timestamp()
-                self._stated_timestamp = dt
-                return
-            except ValueError:
-                continue
+        self._stated_timestamp = default_extractor.extract(self.text, self._stream)
 
     def _extract_data(self) -> None:
         self._extract_timestamp()
+
+
+class MappedLog(Log):
+    """A log line which stays in a memory mapped file until its text is needed"""
+
+    __slots__ = ("_buffer", "_start", "_end")
+
+    def __init__(
+        self, buffer: mmap.mmap, start: int, end: int, stream: str = Streams.STDOUT
+    ) -> None:
+        super().__init__("", stream)
+
+        self._text = None
+        self._buffer = buffer
+        self._start = start
+        self._end = end
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            raw = self._buffer[self._start : self._end]
+            self._text = raw.decode("utf-8", errors="replace").strip()
+
+        return self._text
@@ -1,120 +1,222 @@
+import asyncio
+from collections import deque
 from collections.abc import Callable
-import multiprocessing
-import multiprocessing.connection
-import subprocess
 from logsift.log import Log
-from multiprocessing.connection import Connection
-import threading
+from logsift.sources.source import LogSource
+from logsift.types.overflow import OverflowPolicies
 
 
 class LogManager:
+    """
+    Splits what a source reads into logs and hands them to `log_callback`.
+
+    While ingesting is paused logs are buffered, up to `max_buffered` of them, the
+    overflow policy decides what happens once the buffer is full. Sources feed logs
+    with the `_when_ready` methods, which with the "block" policy only take in as many
+    as there's room for and wait for the rest. The source doesn't read more meanwhile,
+    so the command producing the logs is blocked by its full pipe instead of memory
+    growing.
+    """
+
     MAX_BUFFERED_LOGS = 1000
 
-    def __init__(self, command: str, log_callback: Callable) -> None:
-        self._command = command
-        self.ingest_logs = True
-        self.log_callback: Callable = log_callback
+    def __init__(
+        self,
+        source: LogSource,
+        log_callback: Callable[[list[Log]], None],
+        max_buffered: int = MAX_BUFFERED_LOGS,
+        overflow: str = OverflowPolicies.DROP_OLDEST,
+        buffer_callback: Callable[[], None] | None = None,
+        error_callback: Callable[[BaseException], None] | None = None,
+    ) -> None:
+        if overflow not in OverflowPolicies.ALL:
+            raise ValueError(f"Unknown overflow policy {overflow}")
 
-        self._internal_buffer: list[Log] = []
+        self._source = source
+        self._ingest_logs = True
+        self.log_callback: Callable[[list[Log]], None] = log_callback
+        # called when logs are buffered or dropped instead of ingested
+        self.buffer_callback = buffer_callback
+        # called when the source stops because of an error
+        self.error_callback = error_callback
 
-        self._running = True
+        self._max_buffered = max_buffered
+        self._overflow = overflow
+        self._internal_buffer: deque[Log] = deque()
+        self._remainders: dict[str, bytes] = {}
 
-    def set_command(self, command: str) -> None:
-        self._command = command
+        self._dropped = 0
+        self._sample_stride = 1
+        self._sample_count = 0
 
-    # Command running process
+        self._has_room = asyncio.Event()
+        self._has_room.set()
 
-    def _command_process(self, pipe_conn: Connection, command: str) -> None:
-        with subprocess.Popen(
-            command,
-            shell=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-        ) as process:
-            if process.stdout is None:
-                return
+        self._task: asyncio.Task | None = None
 
-            for line in process.stdout:
-                pipe_conn.send(line.strip())
+    @property
+    def source(self) -> LogSource:
+        return self._source
 
-        pipe_conn.close()
+    @property
+    def ingest_logs(self) -> bool:
+        return self._ingest_logs
 
-    def _setup_command_in_background(
-        self,
-    ) -> tuple[multiprocessing.Process, multiprocessing.connection.Connection]:
-        # TODO: implement ingesting logs via piped command
-        parent_conn, child_conn = multiprocessing.Pipe()
-        process = multiprocessing.Process(
-            target=self._command_process,
-            args=(child_conn, self._command),
-            daemon=True,
-        )
-        self.logs_process = process
-
-        return process, parent_conn
-
-    def _start_command_process(self):
-        command_process, pipe = self._setup_command_in_background()
-        command_process.start()
-        return command_process, pipe
-
-    # Log collection thread
-
-    def _logs_thread_worker(
-        self,
-        process: multiprocessing.Process,
-        connection: multiprocessing.connection.Connection,
+    @ingest_logs.setter
+    def ingest_logs(self, value: bool) -> None:
+        self._ingest_logs = value
+
+        if value:
+            self._has_room.set()
+
+    @property
+    def buffered(self) -> int:
+        return len(self._internal_buffer)
+
+    @property
+    def dropped(self) -> int:
+        """Logs shed by the overflow policy so far"""
+        return self._dropped
+
+    # Log collection
+
+    def feed(self, data: bytes, stream: str) -> None:
+        self._buffer_logs(self._split_lines(data, stream))
+
+    def feed_eof(self, stream: str) -> None:
+        self._buffer_logs(self._split_lines(b"", stream, final=True))
+
+    def feed_logs(self, logs: list[Log]) -> None:
+        self._buffer_logs(logs)
+
+    def discard_partial(self, stream: str) -> None:
+        """Forgets the unfinished line read from `stream`, its end will never come"""
+        self._remainders.pop(stream, None)
+
+    async def feed_when_ready(
+        self, data: bytes, stream: str, final: bool = False
     ) -> None:
-        while process.is_alive() or connection.poll():
-            if not connection.poll():
-                continue
+        await self.feed_logs_when_ready(self._split_lines(data, stream, final))
 
-            log_line = connection.recv()
+    async def feed_logs_when_ready(self, logs: list[Log]) -> None:
+        """Buffers logs, waiting for room as often as the overflow policy needs to"""
+        while len(logs) > 0:
+            await self.wait_for_room()
 
-            if len(self._internal_buffer) > self.MAX_BUFFERED_LOGS:
-                self._internal_buffer.pop(0)
+            room = len(logs)
+            if self._is_blocking():
+                room = self._max_buffered - len(self._internal_buffer)
 
-            self._internal_buffer.append(Log(log_line))
+            self._buffer_logs(logs[:room])
+            logs = logs[room::]
 
-            if not self.ingest_logs:
-                continue
+    async def wait_for_room(self) -> None:
+        """Waits until more logs can be taken in"""
+        while self._is_blocking():
+            if len(self._internal_buffer) < self._max_buffered:
+                return
+
+            self._has_room.clear()
+            await self._has_room.wait()
+
+    def _is_blocking(self) -> bool:
+        return not self._ingest_logs and self._overflow == OverflowPolicies.BLOCK
 
+    def _split_lines(self, data: bytes, stream: str, final: bool = False) -> list[Log]:
+        lines = (self._remainders.get(stream, b"") + data).split(b"\n")
+        remainder = lines.pop()
+
+        if final and remainder != b"":
+            lines.append(remainder)
+            remainder = b""
+
+        self._remainders[stream] = remainder
+
+        return [
+            Log(line.decode("utf-8", errors="replace").strip(), stream)
+            for line in lines
+        ]
+
+    def _buffer_logs(self, logs: list[Log]) -> None:
+        if len(logs) == 0:
+            return
+
+        if self._ingest_logs and len(self._internal_buffer) == 0:
+            self.log_callback(logs)
+            return
+
+        match self._overflow:
+            case OverflowPolicies.SAMPLE:
+                self._sample_logs(logs)
+
+            case OverflowPolicies.DROP_OLDEST:
+                self._internal_buffer.extend(logs)
+
+                overflow = len(self._internal_buffer) - self._max_buffered
+                for _ in range(overflow):
+                    self._internal_buffer.popleft()
+                self._dropped += max(0, overflow)
+
+            case _:
+                # fed only as many logs as there's room for, see feed_logs_when_ready
+                self._internal_buffer.extend(logs)
+
+        if self._ingest_logs:
             self.flush_buffer()
+        elif self.buffer_callback is not None:
+            self.buffer_callback()
 
-            self._internal_buffer = []
+    def _sample_logs(self, logs: list[Log]) -> None:
+        buffer = self._internal_buffer
+
+        for log in logs:
+            self._sample_count += 1
+            if self._sample_count % self._sample_stride != 0:
+                self._dropped += 1
+                continue
+
+            buffer.append(log)
+            if len(buffer) <= self._max_buffered:
+                continue
+
+            # halve what is kept so far, and from now on keep half as many logs
+            kept = list(buffer)[::2]
+            self._dropped += len(buffer) - len(kept)
+
+            buffer.clear()
+            buffer.extend(kept)
+            self._sample_stride *= 2
 
     def flush_buffer(self):
-        for log in self._internal_buffer:
-            self.log_callback(log)
+        self._sample_stride = 1
+        self._sample_count = 0
 
-    def _set_up_log_collection_thread(
-        self,
-        process: multiprocessing.Process,
-        connection: multiprocessing.connection.Connection,
-    ) -> threading.Thread:
-        log_collection_thread = threading.Thread(
-            target=self._logs_thread_worker,
-            args=(process, connection),
-            daemon=True,
-        )
-        return log_collection_thread
-
-    def _start_log_collection(self, command_process, pipe):
-        log_collection_thread = self._set_up_log_collection_thread(
-            command_process, pipe
-        )
-        log_collection_thread.start()
+        if len(self._internal_buffer) == 0:
+            return
+
+        logs = list(self._internal_buffer)
+        self._internal_buffer.clear()
+        self._has_room.set()
+
+        self.log_callback(logs)
 
     # Flow control
 
     def run(self) -> None:
-        command_process, pipe = self._start_command_process()
-        self._start_log_collection(command_process, pipe)
+        """Starts collecting logs, must be called from within a running event loop"""
+        self._task = asyncio.get_running_loop().create_task(self._source.run(self))
+        self._task.add_done_callback(self._source_done)
+
+    def _source_done(self, task: asyncio.Task) -> None:
+        if task.cancelled():
+            return
+
+        error = task.exception()
+        if error is not None and self.error_callback is not None:
+            self.error_callback(error)
 
     def stop(self) -> None:
-        self._running = False
+        self._source.stop()
 
-        self.logs_process.terminate()
-        self.logs_process.join()
-        self.logs_process.close()
+        if self._task is not None:
+            self._task.cancel()
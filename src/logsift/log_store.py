@@ -0,0 +1,184 @@
+import sys
+import threading
+from collections.abc import Iterable, Iterator, Sequence
+from itertools import chain, islice
+from typing import overload
+from logsift.log import Log
+
+
+class LogStore(Sequence[Log]):
+    """
+    Fixed capacity ring buffer of logs, appending and evicting are O(1).
+
+    Every stored log is given a sequence number which only ever increases, so a
+    log can still be identified after older logs have been evicted.
+
+    Logs are stored on the event loop while refilter workers read them, the range a
+    read covers is worked out under a lock that storing takes too. Slots read
+    afterwards may have been overwritten by newer logs, readers skip those.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        if capacity < 1:
+            raise ValueError("Capacity must be at least 1")
+
+        self._capacity = capacity
+        self._buffer: list[Log | None] = [None] * capacity
+        self._head = 0
+        self._size = 0
+        self._next_seq = 0
+
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def first_seq(self) -> int:
+        """Sequence number of the oldest log still stored"""
+        with self._lock:
+            return self._next_seq - self._size
+
+    @property
+    def next_seq(self) -> int:
+        """Sequence number the next appended log will get"""
+        with self._lock:
+            return self._next_seq
+
+    def __len__(self) -> int:
+        return self._size
+
+    def estimate_memory_usage(self, sample_size: int = 256) -> int:
+        """Bytes held by the store and its logs, from an evenly spread sample"""
+        size = sys.getsizeof(self._buffer)
+        if self._size == 0:
+            return size
+
+        step = max(1, self._size // sample_size)
+        sample = [self[index].memory_usage for index in range(0, self._size, step)]
+
+        return size + sum(sample) * self._size // len(sample)
+
+    @overload
+    def __getitem__(self, index: int) -> Log: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[Log]: ...
+
+    def __getitem__(self, index: int | slice) -> Log | list[Log]:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._size)
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+
+            return list(self._range(start, stop))
+
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("LogStore index out of range")
+
+        return self._buffer[(self._head + index) % self._capacity]  # type: ignore[return-value]
+
+    def __iter__(self) -> Iterator[Log]:
+        return self._range(0, self._size)
+
+    def get(self, seq: int) -> Log | None:
+        with self._lock:
+            index = seq - (self._next_seq - self._size)
+            if not 0 <= index < self._size:
+                return None
+
+            return self._buffer[(self._head + index) % self._capacity]
+
+    def since(self, seq: int) -> Iterator[Log]:
+        """Logs with a sequence number of at least `seq`, oldest first"""
+        with self._lock:
+            first_seq = self._next_seq - self._size
+            return self._range(max(0, seq - first_seq), self._size)
+
+    def append(self, log: Log) -> list[Log]:
+        return self.extend((log,))
+
+    def extend(self, logs: Iterable[Log]) -> list[Log]:
+        """Stores logs, returning the ones evicted to make room, oldest first"""
+        logs = list(logs)
+        with self._lock:
+            return self._extend(logs)
+
+    def _extend(self, logs: list[Log]) -> list[Log]:
+        for log in logs:
+            log.seq = self._next_seq
+            self._next_seq += 1
+
+        if len(logs) >= self._capacity:
+            evicted = [*self, *logs[: -self._capacity]]
+
+            self._buffer = list(logs[-self._capacity : :])
+            self._head = 0
+            self._size = self._capacity
+            return evicted
+
+        overflow = max(0, self._size + len(logs) - self._capacity)
+        evicted = list(self._range(0, overflow))
+
+        tail = (self._head + self._size) % self._capacity
+        first_part = min(len(logs), self._capacity - tail)
+        self._buffer[tail : tail + first_part] = logs[:first_part]
+        self._buffer[: len(logs) - first_part] = logs[first_part:]
+
+        self._head = (self._head + overflow) % self._capacity
+        self._size += len(logs) - overflow
+
+        return evicted
+
+    def _range(self, start: int, stop: int) -> Iterator[Log]:
+        if start >= stop:
+            return iter(())
+
+        first = (self._head + start) % self._capacity
+        last = first + (stop - start)
+
+        if last <= self._capacity:
+            return islice(self._buffer, first, last)  # type: ignore[arg-type]
+
+        return chain(
+            islice(self._buffer, first, self._capacity),  # type: ignore[arg-type]
+            islice(self._buffer, 0, last - self._capacity),  # type: ignore[arg-type]
+        )
+
+
+class ChainedLogs(Sequence[Log]):
+    """Shows several sequences of logs as one, without copying them"""
+
+    def __init__(self, *parts: Sequence[Log]) -> None:
+        self._parts = parts
+
+    def __len__(self) -> int:
+        return sum(len(part) for part in self._parts)
+
+    @overload
+    def __getitem__(self, index: int) -> Log: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[Log]: ...
+
+    def __getitem__(self, index: int | slice) -> Log | list[Log]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+        if index < 0:
+            raise IndexError("ChainedLogs index out of range")
+
+        for part in self._parts:
+            if index < len(part):
+                return part[index]
+            index -= len(part)
+
+        raise IndexError("ChainedLogs index out of range")
+
+    def __iter__(self) -> Iterator[Log]:
+        return chain.from_iterable(self._parts)
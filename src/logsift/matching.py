@@ -0,0 +1,41 @@
+from collections.abc import Iterable
+
+try:
+    import ahocorasick  # type: ignore[import-not-found]
+except ImportError:  # optional, see the "fast" extra
+    ahocorasick = None
+
+
+class TermMatcher:
+    """
+    Finds whether any of a set of terms occur in a line.
+
+    With pyahocorasick installed, larger term sets are compiled into a single
+    automaton which scans the line once no matter how many terms there are. Otherwise
+    each term is checked with `in`, which beats a combined regex on CPython.
+    """
+
+    AUTOMATON_MIN_TERMS = 8
+
+    def __init__(self, terms: Iterable[str]) -> None:
+        self.terms = frozenset(terms)
+
+        # an empty term is in every line, and can't be added to the automaton
+        self._always_hit = frozenset(term for term in self.terms if term == "")
+        self._words = tuple(term for term in self.terms if term != "")
+
+        self._automaton = None
+        if ahocorasick is not None and len(self._words) >= self.AUTOMATON_MIN_TERMS:
+            self._automaton = ahocorasick.Automaton()
+            for word in self._words:
+                self._automaton.add_word(word, word)
+            self._automaton.make_automaton()
+
+    def any(self, line: str) -> bool:
+        if len(self._always_hit) > 0:
+            return True
+
+        if self._automaton is not None:
+            return next(self._automaton.iter(line), None) is not None
+
+        return any(word in line for word in self._words)
@@ -0,0 +1,123 @@
+import json
+import time
+from collections.abc import Callable
+from typing import NamedTuple, TextIO
+from logsift.log_collection import LogManager
+from logsift.log_store import LogStore
+
+
+class MetricsSnapshot(NamedTuple):
+    time: float
+    # logs ingested per second since the last snapshot
+    ingest_rate: float
+    # bytes the source produced which haven't been read yet, None when unknown
+    backlog_bytes: int | None
+    buffered: int
+    dropped: int
+    evicted: int
+    stored: int
+    store_bytes: int
+    # None until the first refilter
+    refilter_ms: float | None
+    # averages of the time spent preparing a frame and rendering the rows shown
+    frame_ms: float
+    render_ms: float
+    render_max_ms: float
+    frames_per_second: float
+
+
+MetricsHook = Callable[[MetricsSnapshot], None]
+
+
+class Metrics:
+    """
+    Collects what every stage of the pipeline is doing.
+
+    Stages record their work as it happens, `sample` turns that into a snapshot once
+    in a while and hands it to every hook, e.g. the metrics panel or a file.
+    """
+
+    def __init__(self) -> None:
+        self._hooks: list[MetricsHook] = []
+
+        self._ingested = 0
+        self._refilter_seconds: float | None = None
+        self._frame_seconds: list[float] = []
+        self._render_seconds: list[float] = []
+
+        self._last_sample = time.monotonic()
+        self.last_snapshot: MetricsSnapshot | None = None
+
+    def add_hook(self, hook: MetricsHook) -> None:
+        self._hooks.append(hook)
+
+    def remove_hook(self, hook: MetricsHook) -> None:
+        self._hooks.remove(hook)
+
+    def record_ingest(self, count: int) -> None:
+        self._ingested += count
+
+    def record_refilter(self, seconds: float) -> None:
+        self._refilter_seconds = seconds
+
+    def record_frame(self, seconds: float) -> None:
+        self._frame_seconds.append(seconds)
+
+    def record_render(self, seconds: float) -> None:
+        self._render_seconds.append(seconds)
+
+    def sample(self, store: LogStore, manager: LogManager | None) -> MetricsSnapshot:
+        now = time.monotonic()
+        elapsed = max(now - self._last_sample, 1e-9)
+
+        frames, renders = self._frame_seconds, self._render_seconds
+        snapshot = MetricsSnapshot(
+            time=time.time(),
+            ingest_rate=self._ingested / elapsed,
+            backlog_bytes=manager.source.backlog if manager is not None else 0,
+            buffered=manager.buffered if manager is not None else 0,
+            dropped=manager.dropped if manager is not None else 0,
+            evicted=store.first_seq,
+            stored=len(store),
+            store_bytes=store.estimate_memory_usage(),
+            refilter_ms=(
+                None if self._refilter_seconds is None else self._refilter_seconds * 1e3
+            ),
+            frame_ms=sum(frames) / len(frames) * 1e3 if len(frames) > 0 else 0.0,
+            render_ms=sum(renders) / len(renders) * 1e3 if len(renders) > 0 else 0.0,
+            render_max_ms=max(renders, default=0.0) * 1e3,
+            frames_per_second=len(frames) / elapsed,
+        )
+
+        self._ingested = 0
+        self._frame_seconds = []
+        self._render_seconds = []
+        self._last_sample = now
+        self.last_snapshot = snapshot
+
+        for hook in self._hooks:
+            hook(snapshot)
+
+        return snapshot
+
+
+class MetricsFileLogger:
+    """Hook writing every snapshot to a file as a line of JSON"""
+
+    def __init__(self, path: str) -> None:
+        self._file: TextIO = open(path, "a", buffering=1)
+
+    def __call__(self, snapshot: MetricsSnapshot) -> None:
+        self._file.write(json.dumps(snapshot._asdict()) + "\n")
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def format_bytes(size: float) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{size:,.1f} {unit}"
+        size /= 1024
+
+    return f"{size:,.1f} GiB"
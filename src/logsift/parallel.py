@@ -0,0 +1,334 @@
+import functools
+import multiprocessing
+import os
+import sys
+import threading
+from array import array
+from collections.abc import Sequence
+from concurrent.futures import (
+    CancelledError,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from itertools import accumulate
+from multiprocessing.shared_memory import SharedMemory
+from logsift.filtering import CompiledFilter
+from logsift.log import Log
+
+
+def available_cpus() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+
+    return os.cpu_count() or 1
+
+
+def gil_enabled() -> bool:
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return True if is_gil_enabled is None else is_gil_enabled()
+
+
+@functools.lru_cache(maxsize=8)
+def _worker_filter(key: tuple) -> CompiledFilter:
+    return CompiledFilter(*key)
+
+
+def _shared_buffer(shared: SharedMemory) -> memoryview:
+    buffer = shared.buf
+    if buffer is None:
+        raise ValueError(f"Shared memory {shared.name} is closed")
+
+    return buffer
+
+
+def _match_shard(
+    name: str, offsets_start: int, start: int, stop: int, key: tuple
+) -> list[int]:
+    compiled = _worker_filter(key)
+    # workers share the parent's resource tracker, the parent unlinks the segment
+    shared = SharedMemory(name=name)
+
+    matches: list[int] = []
+    buffer = _shared_buffer(shared)
+    offsets = buffer[offsets_start::].cast("q")
+    try:
+        for index in range(start, stop):
+            with buffer[offsets[index] : offsets[index + 1]] as raw:
+                text = str(raw, "utf-8", "surrogatepass")
+
+            if compiled.match(text):
+                matches.append(index)
+    finally:
+        offsets.release()
+        del buffer
+        shared.close()
+
+    return matches
+
+
+def _warm_up() -> None:
+    pass
+
+
+class PackedLogs:
+    """
+    Log texts copied into shared memory, so workers can read them unpickled.
+
+    Logs are packed as they're first filtered, oldest first. Later calls only
+    append the logs stored since and let go of evicted ones, the segment is only
+    rebuilt once it runs out of room, at twice the size the logs then need.
+    """
+
+    def __init__(self, logs: Sequence[Log]) -> None:
+        encoded = [log.text.encode("utf-8", errors="surrogatepass") for log in logs]
+        text_size = sum(map(len, encoded))
+
+        self._text_capacity = -(-max(text_size * 2, 4096) // 8) * 8
+        self._offsets_capacity = max(len(encoded) * 2, 1024)
+
+        # offsets follow the texts, aligned for the cast back to int64
+        self.offsets_start = self._text_capacity
+        self.shared = SharedMemory(
+            create=True, size=self.offsets_start + (self._offsets_capacity + 1) * 8
+        )
+        self._buffer = _shared_buffer(self.shared)
+        self._offsets = self._buffer[self.offsets_start : :].cast("q")
+        self._offsets[0] = 0
+
+        # the packed logs are offsets[base] onwards
+        self.base = 0
+        self.count = 0
+        self.first_seq = logs[0].seq if len(logs) > 0 else 0
+        self._append(encoded)
+
+    @property
+    def name(self) -> str:
+        return self.shared.name
+
+    @property
+    def end_seq(self) -> int:
+        return self.first_seq + self.count
+
+    def update(self, logs: Sequence[Log]) -> bool:
+        """
+        Brings the packed logs in line with `logs`, which must have consecutive
+        sequence numbers. Returns False when there's no room and a rebuild is needed
+        """
+        first_seq = logs[0].seq
+        if not self.first_seq <= first_seq <= self.end_seq <= first_seq + len(logs):
+            return False
+
+        dropped = first_seq - self.first_seq
+        self.base += dropped
+        self.count -= dropped
+        self.first_seq = first_seq
+
+        encoded = [
+            log.text.encode("utf-8", errors="surrogatepass")
+            for log in logs[self.count : :]
+        ]
+        end = self.base + self.count
+        if (
+            end + len(encoded) > self._offsets_capacity
+            or self._offsets[end] + sum(map(len, encoded)) > self._text_capacity
+        ):
+            return False
+
+        self._append(encoded)
+        return True
+
+    def _append(self, encoded: list[bytes]) -> None:
+        index = self.base + self.count
+        position = self._offsets[index]
+
+        text = b"".join(encoded)
+        self._buffer[position : position + len(text)] = text
+        self._offsets[index + 1 : index + 1 + len(encoded)] = array(
+            "q", accumulate(map(len, encoded), initial=position)
+        )[1::]
+
+        self.count += len(encoded)
+
+    def release(self) -> None:
+        self._offsets.release()
+        self.shared.close()
+        self.shared.unlink()
+
+
+class ParallelFilter:
+    """
+    Filters large amounts of logs across several worker processes.
+
+    The texts are packed into shared memory, only logs not packed yet are copied,
+    each worker matches a contiguous shard and results are merged back in order.
+    On free threaded builds threads are used instead and nothing needs packing.
+
+    Workers are spawned in the background once a filter could use them, or by
+    `start`, spawning them takes longer than filtering serially. Until they're ready
+    `should_use` says no and filters run serially. Each spawned worker imports
+    logsift again, so no more than MAX_WORKERS are used.
+    """
+
+    MIN_LOGS = 50_000
+    MAX_WORKERS = 8
+    SHARDS_PER_WORKER = 4
+
+    def __init__(self, workers: int | None = None) -> None:
+        self._workers = workers or min(available_cpus(), self.MAX_WORKERS)
+
+        self._executor: Executor | None = None
+        self._packed: PackedLogs | None = None
+
+        # spawns the workers and waits for them to be ready, see start
+        self._starter: threading.Thread | None = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self._shut_down = False
+
+    @property
+    def workers(self) -> int:
+        return self._workers
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def should_use(self, count: int) -> bool:
+        """Whether `count` logs are worth filtering in parallel, starts the workers"""
+        if self._workers <= 1 or count < self.MIN_LOGS:
+            return False
+
+        if not self.ready:
+            self.start()
+            return False
+
+        return True
+
+    def start(self, wait: bool = False) -> None:
+        """Starts the workers in the background, waits for them to be ready if `wait`"""
+        with self._lock:
+            if self._starter is None:
+                self._starter = threading.Thread(target=self._start, daemon=True)
+                self._starter.start()
+
+            starter = self._starter
+
+        if wait:
+            starter.join()
+
+    def _start(self) -> None:
+        try:
+            executor = self._get_executor()
+
+            if isinstance(executor, ProcessPoolExecutor):
+                futures = [executor.submit(_warm_up) for _ in range(self._workers)]
+                for future in futures:
+                    future.result()
+        except (CancelledError, RuntimeError):
+            # shut down while starting
+            return
+
+        self._ready.set()
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._shut_down:
+                raise RuntimeError("The parallel filter has been shut down")
+
+            if self._executor is None:
+                if gil_enabled():
+                    # spawned, forking a process running the TUI's threads isn't safe
+                    self._executor = ProcessPoolExecutor(
+                        self._workers, mp_context=multiprocessing.get_context("spawn")
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(self._workers)
+
+            return self._executor
+
+    def _pack(self, logs: Sequence[Log]) -> PackedLogs:
+        # logs from a store have consecutive sequence numbers, unless one was
+        # overwritten while taking them, anything else is packed from scratch
+        consecutive = logs[0].seq >= 0 and logs[-1].seq - logs[0].seq == len(logs) - 1
+
+        packed = self._packed
+        if packed is None or not consecutive or not packed.update(logs):
+            if packed is not None:
+                packed.release()
+
+            packed = self._packed = PackedLogs(logs)
+
+        if not consecutive:
+            # not worth keeping, nothing later could be appended to it
+            self._packed = None
+
+        return packed
+
+    def _shards(self, count: int) -> list[tuple[int, int]]:
+        shard_count = self._workers * self.SHARDS_PER_WORKER
+        size = -(-count // shard_count)
+        return [(start, min(start + size, count)) for start in range(0, count, size)]
+
+    def filter(self, compiled: CompiledFilter, logs: Sequence[Log]) -> list[Log]:
+        """Same result as matching every log with `compiled.match_log`, in order"""
+        if compiled.disabled:
+            return list(logs)
+
+        if len(logs) == 0:
+            return []
+
+        executor = self._get_executor()
+
+        if isinstance(executor, ThreadPoolExecutor):
+            futures = [
+                executor.submit(
+                    lambda start, stop: [
+                        log for log in logs[start:stop] if compiled.match_log(log)
+                    ],
+                    start,
+                    stop,
+                )
+                for start, stop in self._shards(len(logs))
+            ]
+            return [log for future in futures for log in future.result()]
+
+        packed = self._pack(logs)
+        base = packed.base
+        try:
+            shard_futures: list[Future[list[int]]] = [
+                executor.submit(
+                    _match_shard,
+                    packed.name,
+                    packed.offsets_start,
+                    base + start,
+                    base + stop,
+                    compiled.key,
+                )
+                for start, stop in self._shards(packed.count)
+            ]
+
+            hidden = compiled.hidden_streams
+            return [
+                logs[index - base]
+                for future in shard_futures
+                for index in future.result()
+                if logs[index - base].stream not in hidden
+            ]
+        finally:
+            if packed is not self._packed:
+                packed.release()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._shut_down = True
+            self._ready.clear()
+
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        if self._packed is not None:
+            self._packed.release()
+            self._packed = None
@@ -0,0 +1,179 @@
+import math
+import mmap
+import os
+import struct
+from array import array
+from collections.abc import Iterable
+from logsift.log import NOT_COMPUTED, Log, NotComputed
+from logsift.types.streams import Streams
+
+_MAGIC = b"LSSESS1\0"
+# magic, flags, log count, then where the text, text offsets, ingest times, stated
+# timestamps and streams start
+_HEADER = struct.Struct("<8sQQQQQQQ")
+
+# the stated timestamps were looked for when saving
+FLAG_TIMESTAMPS = 1
+
+
+def is_session(path: str) -> bool:
+    try:
+        with open(path, "rb") as file:
+            return file.read(len(_MAGIC)) == _MAGIC
+    except OSError:
+        return False
+
+
+def save_session(path: str, logs: Iterable[Log], extract_timestamps: bool) -> int:
+    """
+    Writes logs to a session file, returning how many were written.
+
+    Text is written as it's read, the columns describing each log follow it once the
+    logs have all been seen. The file is replaced in one go once complete, so a
+    session can be saved over the one it was loaded from.
+    """
+    offsets = array("Q", [0])
+    times = array("d")
+    timestamps = array("d")
+    streams = bytearray()
+
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "wb") as file:
+        file.write(b"\0" * _HEADER.size)
+
+        text_start = file.tell()
+        position = 0
+        for log in logs:
+            text = log.text.encode("utf-8", errors="replace")
+            file.write(text)
+
+            position += len(text)
+            offsets.append(position)
+            times.append(log.time)
+            streams.append(Streams.INDEX.get(log.stream, 0))
+
+            timestamp = log.stated_timestamp if extract_timestamps else None
+            timestamps.append(math.nan if timestamp is None else timestamp)
+
+        columns = []
+        for column in (offsets, times, timestamps, streams):
+            # aligned so every column can be read straight from the mapped file
+            file.write(b"\0" * (-file.tell() % 8))
+            columns.append(file.tell())
+            file.write(column)
+
+        file.seek(0)
+        file.write(
+            _HEADER.pack(
+                _MAGIC,
+                FLAG_TIMESTAMPS if extract_timestamps else 0,
+                len(times),
+                text_start,
+                *columns,
+            )
+        )
+
+    os.replace(temporary_path, path)
+    return len(times)
+
+
+class Session:
+    """
+    A saved session, memory mapped so nothing is read until it's needed.
+
+    Every column is read straight from the mapped file, building a log only looks
+    up its ingest time, stream and stated timestamp, its text is decoded once used.
+    """
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as file:
+            self._buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (
+            magic,
+            flags,
+            self.count,
+            self._text_start,
+            offsets_start,
+            times_start,
+            timestamps_start,
+            streams_start,
+        ) = _HEADER.unpack_from(self._buffer)
+
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is not a LogSift session")
+
+        self.has_timestamps = bool(flags & FLAG_TIMESTAMPS)
+
+        count = self.count
+        view = memoryview(self._buffer)
+        self._offsets = view[offsets_start : offsets_start + (count + 1) * 8].cast("Q")
+        self._times = view[times_start : times_start + count * 8].cast("d")
+        self._timestamps = view[timestamps_start : timestamps_start + count * 8].cast(
+            "d"
+        )
+        self._streams = view[streams_start : streams_start + count]
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def text_size(self) -> int:
+        return self._offsets[self.count]
+
+    def text_offset(self, index: int) -> int:
+        return self._offsets[index]
+
+    def text(self, index: int) -> str:
+        start = self._text_start + self._offsets[index]
+        end = self._text_start + self._offsets[index + 1]
+        return self._buffer[start:end].decode("utf-8", errors="replace")
+
+    def logs(self, start: int, stop: int) -> list[Log]:
+        times, streams, timestamps = self._times, self._streams, self._timestamps
+        has_timestamps = self.has_timestamps
+
+        logs: list[Log] = []
+        for index in range(start, stop):
+            timestamp: float | None | NotComputed = NOT_COMPUTED
+            if has_timestamps:
+                timestamp = timestamps[index]
+                if math.isnan(timestamp):
+                    timestamp = None
+
+            logs.append(
+                SessionLog(
+                    self, index, Streams.ALL[streams[index]], times[index], timestamp
+                )
+            )
+
+        return logs
+
+
+class SessionLog(Log):
+    """A log from a saved session, which stays in the mapped file until needed"""
+
+    __slots__ = ("_session", "_index")
+
+    def __init__(
+        self,
+        session: Session,
+        index: int,
+        stream: str,
+        ingest_time: float,
+        stated_timestamp: float | None | NotComputed,
+    ) -> None:
+        super().__init__("", stream, ingest_time)
+
+        # read from the session file once the text is needed
+        self._text = None
+        self._stated_timestamp = stated_timestamp
+        self._session = session
+        self._index = index
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = self._session.text(self._index)
+
+        return self._text
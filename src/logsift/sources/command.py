@@ -0,0 +1,93 @@
+import asyncio
+import asyncio.subprocess
+import os
+from typing import TYPE_CHECKING
+from logsift.sources.source import LogSource, pending_bytes
+from logsift.types.streams import Streams
+
+if TYPE_CHECKING:
+    from logsift.log_collection import LogManager
+
+
+class CommandSource(LogSource):
+    READ_SIZE = 64 * 1024
+
+    def __init__(self, command: str) -> None:
+        self._command = command
+        self._process: asyncio.subprocess.Process | None = None
+
+        # read ends of the command's output pipes, to ask how much is waiting
+        self._read_fds: list[int] = []
+
+    @property
+    def command(self) -> str:
+        return self._command
+
+    @property
+    def backlog(self) -> int | None:
+        pending = [pending_bytes(fd) for fd in self._read_fds]
+        if any(size is None for size in pending):
+            return None
+
+        return sum(pending)  # type: ignore[arg-type]
+
+    async def run(self, manager: "LogManager") -> None:
+        # the pipes are made here rather than with PIPE, so their read ends are known
+        stdout_read, stdout_write = os.pipe()
+        stderr_read, stderr_write = os.pipe()
+
+        try:
+            self._process = await asyncio.create_subprocess_shell(
+                self._command, stdout=stdout_write, stderr=stderr_write
+            )
+        except BaseException:
+            os.close(stdout_read)
+            os.close(stderr_read)
+            raise
+        finally:
+            os.close(stdout_write)
+            os.close(stderr_write)
+
+        self._read_fds = [stdout_read, stderr_read]
+
+        # both pipes are drained concurrently so neither can fill up and block the command
+        try:
+            await asyncio.gather(
+                self._read_stream(manager, stdout_read, Streams.STDOUT),
+                self._read_stream(manager, stderr_read, Streams.STDERR),
+            )
+        finally:
+            self._read_fds = []
+
+        await self._process.wait()
+
+    async def _read_stream(self, manager: "LogManager", fd: int, name: str) -> None:
+        loop = asyncio.get_running_loop()
+
+        stream = asyncio.StreamReader(limit=self.READ_SIZE)
+        transport, _ = await loop.connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(stream),
+            os.fdopen(fd, "rb", buffering=0),
+        )
+
+        try:
+            # each read returns whatever is buffered, so a read is a natural batch
+            while True:
+                chunk = await stream.read(self.READ_SIZE)
+                if not chunk:
+                    break
+
+                # nothing more is read until the chunk is taken in
+                await manager.feed_when_ready(chunk, name)
+        finally:
+            # once closed the descriptor may be reused, it's no longer asked about.
+            # already gone when the other stream's reader failed and run cleared them
+            if fd in self._read_fds:
+                self._read_fds.remove(fd)
+            transport.close()
+
+        await manager.feed_when_ready(b"", name, final=True)
+
+    def stop(self) -> None:
+        if self._process is not None and self._process.returncode is None:
+            self._process.terminate()
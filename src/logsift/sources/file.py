@@ -0,0 +1,155 @@
+import asyncio
+import mmap
+import os
+from typing import TYPE_CHECKING
+from logsift.log import MappedLog
+from logsift.sources.source import LogSource
+from logsift.types.streams import Streams
+
+if TYPE_CHECKING:
+    from logsift.log_collection import LogManager
+
+
+def find_tail_start(
+    buffer: mmap.mmap, end: int, max_lines: int, block_size: int
+) -> int:
+    """Walks back from `end` in blocks until at least `max_lines` newlines are covered"""
+    start = end
+    newlines = 0
+
+    while start > 0 and newlines <= max_lines:
+        block_start = max(0, start - block_size)
+        newlines += buffer[block_start:start].count(b"\n")
+        start = block_start
+
+    return start
+
+
+def build_line_index(buffer: mmap.mmap, start: int, end: int) -> list[int]:
+    """Offsets of every newline in buffer[start:end]"""
+    offsets: list[int] = []
+    find = buffer.find
+    append = offsets.append
+
+    position = find(b"\n", start, end)
+    while position != -1:
+        append(position)
+        position = find(b"\n", position + 1, end)
+
+    return offsets
+
+
+class FileSource(LogSource):
+    BLOCK_SIZE = 4 * 1024 * 1024
+    READ_SIZE = 256 * 1024
+    FOLLOW_INTERVAL = 0.25
+
+    def __init__(self, path: str, max_lines: int, follow: bool = False) -> None:
+        self._path = path
+        self._max_lines = max_lines
+        self._follow = follow
+        self._running = True
+
+        self._fd: int | None = None
+        self._position = 0
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    async def run(self, manager: "LogManager") -> None:
+        with open(self._path, "rb") as file:
+            self._fd = file.fileno()
+            try:
+                if self._follow:
+                    # read instead of mapped, once the file is truncated mapped logs
+                    # would point past its end and crash the process when read
+                    self._position = self._find_tail(self._fd)
+                    await self._follow_file(manager, self._fd, self._position)
+                else:
+                    self._position = await self._ingest_mapped(manager, self._fd)
+            finally:
+                self._fd = None
+
+    def _find_tail(self, fd: int) -> int:
+        """Where the first line that would be kept starts"""
+        size = os.fstat(fd).st_size
+        if size == 0:
+            return 0
+
+        with mmap.mmap(fd, size, access=mmap.ACCESS_READ) as buffer:
+            spans = self._tail_spans(buffer, size)
+
+        return spans[0][0] if len(spans) > 0 else size
+
+    def _tail_spans(self, buffer: mmap.mmap, size: int) -> list[tuple[int, int]]:
+        """Start and end of each of the last `max_lines` lines in the buffer"""
+        # only the lines that fit in memory are indexed, anything older would be
+        # evicted straight away
+        start = find_tail_start(buffer, size, self._max_lines, self.BLOCK_SIZE)
+        offsets = build_line_index(buffer, start, size)
+
+        line_start = start
+        if start > 0:
+            # the first newline found ends a line which started before the region
+            line_start = offsets.pop(0) + 1
+
+        spans: list[tuple[int, int]] = []
+        for end in offsets:
+            spans.append((line_start, end))
+            line_start = end + 1
+
+        if line_start < size:
+            spans.append((line_start, size))
+
+        return spans[-self._max_lines : :]
+
+    async def _ingest_mapped(self, manager: "LogManager", fd: int) -> int:
+        size = os.fstat(fd).st_size
+        if size == 0:
+            return 0
+
+        buffer = mmap.mmap(fd, size, access=mmap.ACCESS_READ)
+        spans = self._tail_spans(buffer, size)
+
+        for index in range(0, len(spans), self.BATCH_SIZE):
+            await manager.feed_logs_when_ready(
+                [
+                    MappedLog(buffer, start, end, Streams.STDOUT)
+                    for start, end in spans[index : index + self.BATCH_SIZE]
+                ]
+            )
+            await asyncio.sleep(0)
+
+        return size
+
+    async def _follow_file(self, manager: "LogManager", fd: int, position: int) -> None:
+        while self._running:
+            size = os.fstat(fd).st_size
+
+            if size < position:
+                # truncated or rotated in place, start over without the line that
+                # was cut off
+                position = 0
+                manager.discard_partial(Streams.STDOUT)
+
+            while position < size:
+                chunk = os.pread(fd, min(self.READ_SIZE, size - position), position)
+                if not chunk:
+                    break
+
+                position += len(chunk)
+                self._position = position
+                await manager.feed_when_ready(chunk, Streams.STDOUT)
+
+            await asyncio.sleep(self.FOLLOW_INTERVAL)
+
+    def stop(self) -> None:
+        self._running = False
+
+    @property
+    def backlog(self) -> int | None:
+        if self._fd is None:
+            return 0
+
+        return max(0, os.fstat(self._fd).st_size - self._position)
@@ -0,0 +1,53 @@
+import asyncio
+from typing import TYPE_CHECKING
+from logsift.session import Session
+from logsift.sources.source import LogSource
+
+if TYPE_CHECKING:
+    from logsift.log_collection import LogManager
+
+
+class SessionSource(LogSource):
+    """Reopens a saved session, only the logs which would be kept are loaded"""
+
+    def __init__(self, path: str, max_lines: int | None) -> None:
+        self._path = path
+        self._max_lines = max_lines
+        self._running = True
+
+        self._session: Session | None = None
+        self._position = 0
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    async def run(self, manager: "LogManager") -> None:
+        session = self._session = Session(self._path)
+
+        start = 0
+        if self._max_lines is not None:
+            start = max(0, len(session) - self._max_lines)
+
+        for index in range(start, len(session), self.BATCH_SIZE):
+            if not self._running:
+                break
+
+            self._position = index
+            await manager.feed_logs_when_ready(
+                session.logs(index, min(index + self.BATCH_SIZE, len(session)))
+            )
+            await asyncio.sleep(0)
+
+        self._position = len(session)
+
+    def stop(self) -> None:
+        self._running = False
+
+    @property
+    def backlog(self) -> int | None:
+        session = self._session
+        if session is None:
+            return 0
+
+        return session.text_size - session.text_offset(self._position)
@@ -0,0 +1,44 @@
+import struct
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING
+
+try:
+    import fcntl
+    import termios
+except ImportError:  # not available on windows
+    fcntl = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    from logsift.log_collection import LogManager
+
+
+def pending_bytes(fd: int) -> int | None:
+    """Bytes waiting to be read from a pipe, None where that can't be asked"""
+    if fcntl is None:
+        return None
+
+    try:
+        result = fcntl.ioctl(fd, termios.FIONREAD, b"\0" * 4)
+    except OSError:
+        return None
+
+    return struct.unpack("i", result)[0]
+
+
+class LogSource(ABC):
+    """Somewhere logs are collected from, feeds raw data into a LogManager"""
+
+    # logs fed at a time by sources reading many at once, e.g. from a file
+    BATCH_SIZE = 10_000
+
+    @abstractmethod
+    async def run(self, manager: "LogManager") -> None:
+        """Feeds `manager` until the source runs out or is stopped"""
+
+    def stop(self) -> None:
+        pass
+
+    @property
+    def backlog(self) -> int | None:
+        """Bytes produced but not read yet, None when unknown"""
+        return None
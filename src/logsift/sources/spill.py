@@ -0,0 +1,42 @@
+import asyncio
+from itertools import islice
+from typing import TYPE_CHECKING
+from logsift.cold_storage import ColdStore
+from logsift.sources.source import LogSource
+
+if TYPE_CHECKING:
+    from logsift.log_collection import LogManager
+
+
+class SpillSource(LogSource):
+    """Reopens a file kept with --spill-file, only logs which would be kept are read"""
+
+    def __init__(self, path: str, max_lines: int | None) -> None:
+        self._path = path
+        self._max_lines = max_lines
+        self._running = True
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    async def run(self, manager: "LogManager") -> None:
+        store = ColdStore(self._path, read_only=True)
+        try:
+            start_seq = store.first_seq
+            if self._max_lines is not None:
+                start_seq = max(start_seq, store.end_seq - self._max_lines)
+
+            logs = store.iter_logs(start_seq)
+            while self._running:
+                batch = list(islice(logs, self.BATCH_SIZE))
+                if len(batch) == 0:
+                    break
+
+                await manager.feed_logs_when_ready(batch)
+                await asyncio.sleep(0)
+        finally:
+            store.close()
+
+    def stop(self) -> None:
+        self._running = False
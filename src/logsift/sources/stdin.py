@@ -0,0 +1,97 @@
+import asyncio
+import os
+from concurrent.futures import CancelledError
+import sys
+import threading
+from typing import TYPE_CHECKING
+from logsift.sources.source import LogSource, pending_bytes
+from logsift.types.streams import Streams
+
+if TYPE_CHECKING:
+    from logsift.log_collection import LogManager
+
+
+def detach_piped_stdin() -> int | None:
+    """
+    Moves piped stdin onto a new file descriptor and reattaches the terminal as stdin,
+    so the TUI can still read the keyboard while logs are read from the pipe.
+    """
+    if sys.stdin is None or sys.stdin.isatty():
+        return None
+
+    stdin_fd = sys.stdin.fileno()
+    input_fd = os.dup(stdin_fd)
+
+    tty_fd = os.open("/dev/tty", os.O_RDWR)
+    os.dup2(tty_fd, stdin_fd)
+    os.close(tty_fd)
+
+    return input_fd
+
+
+class StdinSource(LogSource):
+    READ_SIZE = 256 * 1024
+
+    def __init__(self, input_fd: int) -> None:
+        self._input_fd = input_fd
+        self._running = True
+        self._reading = False
+
+    async def run(self, manager: "LogManager") -> None:
+        loop = asyncio.get_running_loop()
+        done = loop.create_future()
+
+        # a plain daemon thread, an executor would keep the app from exiting while
+        # the pipe is still open
+        thread = threading.Thread(
+            target=self._read_worker, args=(loop, manager, done), daemon=True
+        )
+        thread.start()
+
+        await done
+
+    def _read_worker(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        manager: "LogManager",
+        done: asyncio.Future,
+    ) -> None:
+        buffer = bytearray(self.READ_SIZE)
+        view = memoryview(buffer)
+
+        self._reading = True
+        try:
+            with open(self._input_fd, "rb", buffering=0) as file:
+                while self._running and (size := file.readinto(buffer)):
+                    # waits for the chunk to be taken in, so reading never runs ahead
+                    # of ingesting and a full pipe blocks whatever is writing to it
+                    try:
+                        asyncio.run_coroutine_threadsafe(
+                            manager.feed_when_ready(bytes(view[:size]), Streams.STDOUT),
+                            loop,
+                        ).result()
+                    except (CancelledError, RuntimeError):
+                        # the app is shutting down
+                        return
+        except OSError as exc:
+            self._reading = False
+            loop.call_soon_threadsafe(done.set_exception, exc)
+            return
+
+        self._reading = False
+        try:
+            asyncio.run_coroutine_threadsafe(
+                manager.feed_when_ready(b"", Streams.STDOUT, final=True), loop
+            ).result()
+        except (CancelledError, RuntimeError):
+            return
+
+        loop.call_soon_threadsafe(done.set_result, None)
+
+    def stop(self) -> None:
+        self._running = False
+
+    @property
+    def backlog(self) -> int | None:
+        # once closed the descriptor may have been reused
+        return pending_bytes(self._input_fd) if self._reading else 0
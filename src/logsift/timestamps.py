@@ -0,0 +1,188 @@
+import datetime
+import re
+from collections.abc import Callable
+from typing import NamedTuple
+
+MONTHS = {
+    month: index
+    for index, month in enumerate(
+        (
+            "Jan",
+            "Feb",
+            "Mar",
+            "Apr",
+            "May",
+            "Jun",
+            "Jul",
+            "Aug",
+            "Sep",
+            "Oct",
+            "Nov",
+            "Dec",
+        ),
+        start=1,
+    )
+}
+
+_MONTH_PATTERN = "|".join(MONTHS)
+
+
+def _parse_iso(match: re.Match) -> float:
+    date, time, fraction, zone = match.group("date", "time", "fraction", "zone")
+
+    # normalised to what fromisoformat accepts on python 3.10
+    value = f"{date}T{time}"
+    if fraction:
+        value += "." + fraction[1:7].ljust(6, "0")
+    if zone:
+        if zone == "Z":
+            zone = "+00:00"
+        elif ":" not in zone:
+            zone = f"{zone[:3]}:{zone[3:]}"
+        value += zone
+
+    return datetime.datetime.fromisoformat(value).timestamp()
+
+
+def _parse_syslog(match: re.Match) -> float:
+    # syslog does not state the year, assume the current one
+    month, day, time = match.group("month", "day", "time")
+    hour, minute, second = map(int, time.split(":"))
+
+    return datetime.datetime(
+        datetime.datetime.now().year, MONTHS[month], int(day), hour, minute, second
+    ).timestamp()
+
+
+def _parse_clf(match: re.Match) -> float:
+    day, month, year, time, zone = match.group("day", "month", "year", "time", "zone")
+    hour, minute, second = map(int, time.split(":"))
+
+    offset = datetime.timedelta(hours=int(zone[1:3]), minutes=int(zone[3:5]))
+    tz = datetime.timezone(offset if zone[0] == "+" else -offset)
+
+    return datetime.datetime(
+        int(year), MONTHS[month], int(day), hour, minute, second, tzinfo=tz
+    ).timestamp()
+
+
+def _parse_epoch(match: re.Match) -> float:
+    value = float(match.group(0))
+    return value / 1000 if value > 1e11 else value
+
+
+class TimestampFormat(NamedTuple):
+    name: str
+    pattern: re.Pattern
+    parse: Callable[[re.Match], float]
+
+
+FORMATS: tuple[TimestampFormat, ...] = (
+    TimestampFormat(
+        "iso-8601",
+        re.compile(
+            r"(?P<date>\d{4}-\d{2}-\d{2})[T ](?P<time>\d{2}:\d{2}:\d{2})"
+            r"(?P<fraction>[.,]\d+)?(?P<zone>Z|[+-]\d{2}:?\d{2})?"
+        ),
+        _parse_iso,
+    ),
+    TimestampFormat(
+        "syslog",
+        re.compile(
+            rf"(?P<month>{_MONTH_PATTERN}) (?P<day>[ \d]\d) (?P<time>\d{{2}}:\d{{2}}:\d{{2}})"
+        ),
+        _parse_syslog,
+    ),
+    TimestampFormat(
+        "common-log-format",
+        re.compile(
+            rf"(?P<day>\d{{2}})/(?P<month>{_MONTH_PATTERN})/(?P<year>\d{{4}})"
+            r":(?P<time>\d{2}:\d{2}:\d{2}) (?P<zone>[+-]\d{4})"
+        ),
+        _parse_clf,
+    ),
+    TimestampFormat(
+        "epoch",
+        re.compile(r"(?<![\d.])1\d{9}(?:\d{3})?(?:\.\d+)?(?![\d.])"),
+        _parse_epoch,
+    ),
+)
+
+
+class TimestampExtractor:
+    """
+    Finds the timestamp stated in a log line.
+
+    The format and column which matched last are remembered per stream and tried
+    first, logs from one source almost always share a layout.
+    """
+
+    def __init__(
+        self, formats: tuple[TimestampFormat, ...] = FORMATS, enabled: bool = True
+    ) -> None:
+        self._formats = formats
+        self._enabled = enabled
+
+        self._last_match: dict[str, tuple[TimestampFormat, int]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, value: bool) -> None:
+        if not isinstance(value, bool):
+            raise ValueError("Enabled must be a boolean")
+        self._enabled = value
+
+    def extract(self, text: str, stream: str) -> float | None:
+        if not self._enabled:
+            return None
+
+        last_match = self._last_match.get(stream)
+        if last_match is not None:
+            format_, column = last_match
+
+            match = format_.pattern.match(text, column)
+            if match is not None:
+                timestamp = self._parse(format_, match)
+                if timestamp is not None:
+                    return timestamp
+
+                # looked like the remembered format but isn't, find it again below
+                self._last_match.pop(stream, None)
+
+        for format_ in self._formats:
+            match = format_.pattern.search(text)
+            if match is None:
+                continue
+
+            timestamp = self._parse(format_, match)
+            if timestamp is None:
+                continue
+
+            self._last_match[stream] = (format_, match.start())
+            return timestamp
+
+        return self._fallback(text)
+
+    def _parse(self, format_: TimestampFormat, match: re.Match) -> float | None:
+        try:
+            return format_.parse(match)
+        except (ValueError, OverflowError):
+            return None
+
+    def _fallback(self, text: str) -> float | None:
+        for token in text.split(" "):
+            if len(token) < 8 or not token[0].isdigit():
+                continue
+
+            try:
+                return datetime.datetime.fromisoformat(token).timestamp()
+            except ValueError:
+                continue
+
+        return None
+
+
+default_extractor = TimestampExtractor()
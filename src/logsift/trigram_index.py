@@ -0,0 +1,150 @@
+import threading
+from array import array
+from collections.abc import Iterable
+from logsift.filtering import CompiledFilter
+from logsift.log import Log
+
+
+def trigrams(text: str) -> set[str]:
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+class _Postings:
+    """Sequence numbers of the logs containing a trigram, oldest first"""
+
+    __slots__ = ("seqs", "start")
+
+    def __init__(self) -> None:
+        self.seqs = array("q")
+        # evicted entries are skipped rather than shifted out, see `pop_oldest`
+        self.start = 0
+
+    def __len__(self) -> int:
+        return len(self.seqs) - self.start
+
+    def pop_oldest(self) -> None:
+        self.start += 1
+
+        if self.start > 64 and self.start * 2 > len(self.seqs):
+            del self.seqs[: self.start]
+            self.start = 0
+
+    def as_set(self) -> set[int]:
+        return set(self.seqs[self.start : :])
+
+
+class TrigramIndex:
+    """
+    Inverted index from lowercased trigrams to the logs containing them.
+
+    Kept up to date as logs are stored and evicted. A filter term of at least three
+    characters can then be answered by intersecting posting lists, leaving only the
+    candidates to be confirmed with a real substring check.
+    """
+
+    # rough per trigram overhead of the dict entry, key and posting list objects
+    _ENTRY_OVERHEAD = 200
+
+    def __init__(self) -> None:
+        self._postings: dict[str, _Postings] = {}
+        self._entries = 0
+        self._lock = threading.Lock()
+
+        # every log with a lower seq has been indexed
+        self.end_seq = 0
+
+    @property
+    def memory_usage(self) -> int:
+        """Estimated bytes held by the index"""
+        return len(self._postings) * self._ENTRY_OVERHEAD + self._entries * 8
+
+    def add(self, logs: Iterable[Log]) -> None:
+        with self._lock:
+            postings = self._postings
+            for log in logs:
+                seq = log.seq
+                for trigram in trigrams(log.text.lower()):
+                    posting = postings.get(trigram)
+                    if posting is None:
+                        posting = postings[trigram] = _Postings()
+
+                    posting.seqs.append(seq)
+                    self._entries += 1
+
+                self.end_seq = seq + 1
+
+    def remove(self, logs: Iterable[Log]) -> None:
+        """Removes evicted logs, which are always the oldest ones indexed"""
+        with self._lock:
+            postings = self._postings
+            for log in logs:
+                for trigram in trigrams(log.text.lower()):
+                    posting = postings.get(trigram)
+                    if posting is None:
+                        continue
+
+                    posting.pop_oldest()
+                    self._entries -= 1
+
+                    if len(posting) == 0:
+                        del postings[trigram]
+
+    def term_candidates(self, term: str) -> set[int] | None:
+        """Seqs of logs which may contain `term`, None when the index can't tell"""
+        term_trigrams = trigrams(term.lower())
+        if len(term_trigrams) == 0:
+            return None
+
+        with self._lock:
+            postings = [self._postings.get(trigram) for trigram in term_trigrams]
+            if any(posting is None for posting in postings):
+                return set()
+
+            postings.sort(key=len)  # type: ignore[arg-type]
+
+            candidates = postings[0].as_set()  # type: ignore[union-attr]
+            for posting in postings[1::]:
+                if len(candidates) == 0:
+                    break
+                candidates.intersection_update(posting.seqs[posting.start : :])  # type: ignore[union-attr]
+
+        return candidates
+
+    def candidates(self, compiled: CompiledFilter) -> list[int] | None:
+        """
+        Sorted seqs of the logs which may match the filter, or None when the filter
+        can't be answered from the index (short terms, negations in "any" mode...)
+        """
+        if compiled.disabled or not compiled.has_terms:
+            return None
+
+        if compiled.match_all:
+            term_sets = [
+                candidates
+                for term in compiled.positive
+                if (candidates := self.term_candidates(term)) is not None
+            ]
+            if len(term_sets) == 0:
+                return None
+
+            term_sets.sort(key=len)
+            result = term_sets[0]
+            for candidates in term_sets[1::]:
+                result &= candidates
+
+            return sorted(result)
+
+        # a negative term matches nearly everything in "any" mode, and regexes or
+        # fields can match logs without any of the plain terms
+        if len(compiled.negative) > 0 or compiled.has_patterns:
+            return None
+
+        result = set()
+        for term in compiled.positive:
+            candidates = self.term_candidates(term)
+            if candidates is None:
+                return None
+
+            result |= candidates
+
+        return sorted(result)
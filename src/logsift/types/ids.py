@@ -6,16 +6,27 @@ class Ids:
     HELP = "help-panel"
     FILTER_CONTAINER = "filter-container"
     HELP_BUTTON = "help-button"
+    METRICS_PANEL = "metrics-panel"
 
     LOGS_COUNT = "logs-count"
     FILTERED_LOGS_COUNT = "filtered-logs-count"
     FILTER_EXPLANATION = "filter-explanation"
+    EVICTED_LOGS_COUNT = "evicted-logs-count"
+    BUFFERED_LOGS_COUNT = "buffered-logs-count"
+    DROPPED_LOGS_COUNT = "dropped-logs-count"
+    INDEX_MEMORY = "index-memory"
+    HISTORY_SIZE = "history-size"
+    EXPORT_PROGRESS = "export-progress"
 
     PAUSE_INGESTING_LOGS_TOGGLE = "pause-ingesting-logs-toggle"
     FILTER_TOGGLE = "filter-toggle"
     CASE_INSENSITIVE_TOGGLE = "case-insensitive-toggle"
     WORD_WRAP_TOGGLE = "word-wrap-toggle"
     AUTO_SCROLL_TOGGLE = "auto-scroll-toggle"
+    STDOUT_TOGGLE = "stdout-toggle"
+    STDERR_TOGGLE = "stderr-toggle"
+    TRIGRAM_INDEX_TOGGLE = "trigram-index-toggle"
+    SEARCH_HISTORY_TOGGLE = "search-history-toggle"
 
     FILTER_HIGHLIGHT = "filter-highlight-toggle"
     FILTER_OMIT = "filter-omit-toggle"
@@ -0,0 +1,9 @@
+class OverflowPolicies:
+    # stop reading from the source until there is room, the command itself blocks
+    BLOCK = "block"
+    # evict the oldest buffered logs
+    DROP_OLDEST = "drop-oldest"
+    # keep an evenly spread sample, thinned out further each time the buffer fills
+    SAMPLE = "sample"
+
+    ALL = (BLOCK, DROP_OLDEST, SAMPLE)
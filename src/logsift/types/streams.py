@@ -0,0 +1,7 @@
+class Streams:
+    STDOUT = "stdout"
+    STDERR = "stderr"
+
+    # numbered in this order when written to disk
+    ALL = (STDOUT, STDERR)
+    INDEX = {stream: index for index, stream in enumerate(ALL)}
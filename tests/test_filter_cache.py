@@ -0,0 +1,153 @@
+import random
+from logsift.filter_cache import FilterCache, narrows
+from logsift.filtering import CompiledFilter, compile_filter
+from logsift.log import Log
+from logsift.log_store import LogStore
+from logsift.trigram_index import TrigramIndex
+from logsift.types.streams import Streams
+
+WORDS = ("error", "warn", "info", "request", "timeout", "user", "db", "cache")
+
+
+def make_filter(
+    filter_: str,
+    case_insensitive: bool = False,
+    match_all: bool = False,
+    hidden_streams: frozenset[str] = frozenset(),
+) -> CompiledFilter:
+    return compile_filter(filter_, case_insensitive, match_all, hidden_streams, True)
+
+
+def make_logs(rng: random.Random, count: int) -> list[Log]:
+    return [
+        Log(
+            " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 5))),
+            rng.choice(Streams.ALL),
+        )
+        for _ in range(count)
+    ]
+
+
+def serial(compiled: CompiledFilter, store: LogStore) -> list[Log]:
+    return [log for log in store if compiled.match_log(log)]
+
+
+def test_narrows():
+    assert narrows(make_filter("error"), make_filter("err"))
+    assert narrows(make_filter("err db", match_all=True), make_filter("err"))
+    assert narrows(make_filter("err"), make_filter("err db"))
+    assert narrows(
+        make_filter("err", hidden_streams=frozenset({Streams.STDERR})),
+        make_filter("err"),
+    )
+    assert narrows(make_filter("err"), make_filter(""))
+
+    assert not narrows(make_filter("err"), make_filter("error"))
+    assert not narrows(make_filter("err"), make_filter("err db", match_all=True))
+    assert not narrows(make_filter("err", case_insensitive=True), make_filter("err"))
+    assert not narrows(
+        make_filter("err"),
+        make_filter("err", hidden_streams=frozenset({Streams.STDERR})),
+    )
+    assert narrows(make_filter("!err"), make_filter("!error"))
+    assert not narrows(make_filter("!error"), make_filter("!err"))
+
+
+def run_typing(cache: FilterCache, index: TrigramIndex | None = None) -> None:
+    rng = random.Random(1234)
+    store = LogStore(500)
+
+    def ingest(count: int) -> None:
+        logs = make_logs(rng, count)
+        evicted = store.extend(logs)
+        if index is not None:
+            index.add(logs)
+            index.remove(evicted)
+        cache.trim(store)
+
+    ingest(400)
+
+    # typed one character at a time and deleted again, in both modes, while logs
+    # keep arriving and evicting older ones
+    filters = [
+        *(make_filter("timeout"[:length]) for length in range(1, 8)),
+        *(make_filter("timeout"[:length]) for length in range(7, 0, -1)),
+        *(make_filter(f"user {word}", match_all=True) for word in ("d", "db", "")),
+        make_filter("error warn info"),
+        make_filter("error warn"),
+        make_filter("error"),
+        make_filter("error !db"),
+        make_filter("ERROR", case_insensitive=True),
+        make_filter("request", hidden_streams=frozenset({Streams.STDERR})),
+        make_filter("request"),
+    ]
+    for compiled in filters:
+        assert cache.filter(compiled, store) == serial(compiled, store)
+        ingest(rng.randint(0, 150))
+        assert cache.filter(compiled, store) == serial(compiled, store)
+
+    # every result is kept up to date, whichever filter is asked for again
+    ingest(300)
+    for compiled in reversed(filters):
+        assert cache.filter(compiled, store) == serial(compiled, store)
+
+
+def test_results_match_serial_filtering():
+    run_typing(FilterCache())
+
+
+def test_indexed_results_match_serial_filtering():
+    cache = FilterCache()
+    cache.index = TrigramIndex()
+    run_typing(cache, cache.index)
+
+
+def test_trim_drops_evicted_logs():
+    rng = random.Random(99)
+    store = LogStore(100)
+    store.extend(make_logs(rng, 100))
+
+    cache = FilterCache()
+    compiled = make_filter("db")
+    result = cache.filter(compiled, store)
+
+    store.extend(make_logs(rng, 60))
+    cache.trim(store)
+
+    assert all(log.seq >= store.first_seq for log in result)
+    assert result == [log for log in serial(compiled, store) if log.seq < 100]
+
+
+def test_copy_leaves_earlier_results_alone():
+    rng = random.Random(7)
+    store = LogStore(100)
+    store.extend(make_logs(rng, 100))
+
+    cache = FilterCache()
+    shown = cache.filter(make_filter("user"), store)
+    before = list(shown)
+
+    store.extend(make_logs(rng, 50))
+    # narrows the shown result, which is brought up to date as its base
+    narrower = make_filter("user db", match_all=True)
+    assert cache.filter(narrower, store, copy=True) == serial(narrower, store)
+    assert shown == before
+
+
+def test_update_never_builds_a_result():
+    rng = random.Random(3)
+    store = LogStore(100)
+    store.extend(make_logs(rng, 80))
+
+    cache = FilterCache()
+    compiled = make_filter("cache")
+    assert cache.update(compiled, store) is None
+
+    # not built by the call above, so nothing is cached still
+    assert cache.update(compiled, store) is None
+
+    result = cache.filter(compiled, store)
+    store.extend(make_logs(rng, 50))
+
+    assert cache.update(compiled, store) is result
+    assert result == serial(compiled, store)
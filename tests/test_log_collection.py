@@ -0,0 +1,31 @@
+import asyncio
+from logsift.log_collection import LogManager
+from logsift.sources.command import CommandSource
+from logsift.types.overflow import OverflowPolicies
+
+
+def test_block_policy_keeps_buffer_within_limit():
+    max_buffered = 50
+    ingested = []
+
+    async def run() -> int:
+        # both streams write far more than the buffer holds, in single large reads
+        manager = LogManager(
+            CommandSource("seq 1 100000; seq 1 100000 >&2"),
+            ingested.extend,
+            max_buffered=max_buffered,
+            overflow=OverflowPolicies.BLOCK,
+        )
+        manager.ingest_logs = False
+        manager.run()
+
+        most_buffered = 0
+        for _ in range(50):
+            await asyncio.sleep(0.01)
+            most_buffered = max(most_buffered, manager.buffered)
+
+        manager.stop()
+        return most_buffered
+
+    assert 0 < asyncio.run(run()) <= max_buffered
+    assert len(ingested) == 0
@@ -0,0 +1,69 @@
+import pytest
+from logsift.log import Log
+from logsift.log_store import ChainedLogs, LogStore
+
+
+def make_logs(count: int, prefix: str = "log") -> list[Log]:
+    return [Log(f"{prefix} {index}") for index in range(count)]
+
+
+def test_get_by_seq_after_wrap_around():
+    store = LogStore(4)
+    logs = make_logs(10)
+
+    # one at a time and in batches, so the head wraps around more than once
+    store.append(logs[0])
+    store.extend(logs[1:3])
+    store.extend(logs[3:7])
+    store.extend(logs[7:10])
+
+    assert list(store) == logs[6:]
+    assert store.first_seq == 6
+    assert store.next_seq == 10
+
+    for log in logs[6:]:
+        assert store.get(log.seq) is log
+    for log in logs[:6]:
+        assert store.get(log.seq) is None
+    assert store.get(10) is None
+
+    assert list(store.since(8)) == logs[8:]
+    assert store[-1] is logs[-1]
+    assert store[1:3] == logs[7:9]
+
+
+@pytest.mark.parametrize("batch", [1, 3, 4, 9])
+def test_evicted_logs_are_returned_oldest_first(batch: int):
+    store = LogStore(4)
+    logs = make_logs(20)
+
+    evicted: list[Log] = []
+    for index in range(0, len(logs), batch):
+        evicted.extend(store.extend(logs[index : index + batch]))
+
+    assert evicted == logs[:16]
+    assert list(store) == logs[16:]
+    assert len(store) == 4
+    assert [log.seq for log in logs] == list(range(20))
+
+
+def test_batch_larger_than_capacity():
+    store = LogStore(3)
+    logs = make_logs(5)
+
+    store.append(logs[0])
+    assert store.extend(logs[1:]) == logs[:2]
+    assert list(store) == logs[2:]
+    assert store.first_seq == 2
+
+
+def test_chained_logs():
+    first, second = make_logs(2, "first"), make_logs(3, "second")
+    chained = ChainedLogs(first, second)
+
+    assert len(chained) == 5
+    assert list(chained) == first + second
+    assert chained[2] is second[0]
+    assert chained[-1] is second[-1]
+    with pytest.raises(IndexError):
+        chained[5]
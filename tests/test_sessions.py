@@ -0,0 +1,77 @@
+import asyncio
+import pytest
+from logsift.cold_storage import ColdStore
+from logsift.log import Log
+from logsift.log_collection import LogManager
+from logsift.session import save_session
+from logsift.sources.session import SessionSource
+from logsift.sources.source import LogSource
+from logsift.sources.spill import SpillSource
+from logsift.types.streams import Streams
+
+# a few batches, the last one partial
+BATCH_SIZE = 4
+COUNTS = [0, 1, 3 * BATCH_SIZE + 1]
+
+
+def make_logs(count: int, first_seq: int = 0) -> list[Log]:
+    logs = []
+    for index in range(count):
+        stream = Streams.STDERR if index % 3 == 0 else Streams.STDOUT
+        log = Log(f"log {index} ünïcode", stream, ingest_time=1000.0 + index)
+        log.seq = first_seq + index
+        logs.append(log)
+
+    return logs
+
+
+def load(source: LogSource) -> list[Log]:
+    loaded: list[Log] = []
+    batches: list[int] = []
+
+    def ingest(logs: list[Log]) -> None:
+        batches.append(len(logs))
+        loaded.extend(logs)
+
+    async def run() -> None:
+        await source.run(LogManager(source, ingest))
+
+    asyncio.run(run())
+    assert all(size <= BATCH_SIZE for size in batches)
+    return loaded
+
+
+def assert_same(loaded: list[Log], expected: list[Log]) -> None:
+    assert [(log.text, log.stream, log.time) for log in loaded] == [
+        (log.text, log.stream, log.time) for log in expected
+    ]
+
+
+@pytest.fixture(autouse=True)
+def small_batches(monkeypatch):
+    monkeypatch.setattr(LogSource, "BATCH_SIZE", BATCH_SIZE)
+
+
+@pytest.mark.parametrize("count", COUNTS)
+@pytest.mark.parametrize("max_lines", [None, 5])
+def test_session_round_trip(tmp_path, count, max_lines):
+    path = str(tmp_path / "saved.session")
+    logs = make_logs(count)
+    assert save_session(path, logs, extract_timestamps=False) == count
+
+    expected = logs if max_lines is None else logs[-max_lines::]
+    assert_same(load(SessionSource(path, max_lines)), expected)
+
+
+@pytest.mark.parametrize("count", COUNTS)
+@pytest.mark.parametrize("max_lines", [None, 5])
+def test_spill_round_trip(tmp_path, count, max_lines):
+    path = str(tmp_path / "kept.cold")
+    # evicted logs don't start at 0, and the last block is only written on close
+    logs = make_logs(count, first_seq=100)
+    store = ColdStore(path, block_size=3)
+    store.add(logs)
+    store.close()
+
+    expected = logs if max_lines is None else logs[-max_lines::]
+    assert_same(load(SpillSource(path, max_lines)), expected)
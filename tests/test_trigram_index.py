@@ -0,0 +1,90 @@
+import random
+from logsift.filtering import CompiledFilter, compile_filter
+from logsift.log import Log
+from logsift.log_store import LogStore
+from logsift.trigram_index import TrigramIndex
+
+WORDS = ("error", "warning", "request", "timeout", "database", "user", "cache")
+
+
+def make_logs(rng: random.Random, count: int) -> list[Log]:
+    return [
+        Log(" ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4))))
+        for _ in range(count)
+    ]
+
+
+def assert_superset(index: TrigramIndex, store: LogStore, compiled: CompiledFilter):
+    candidates = index.candidates(compiled)
+    if candidates is None:
+        return
+
+    matches = {log.seq for log in store if compiled.match_log(log)}
+    assert matches <= set(candidates)
+    assert candidates == sorted(candidates)
+
+
+FILTERS = [
+    compile_filter(filter_, case_insensitive, match_all, frozenset(), True)
+    for filter_ in ("error", "time", "user data", "req !cache", "xyz", "WARN")
+    for case_insensitive in (False, True)
+    for match_all in (False, True)
+]
+
+
+def test_candidates_cover_matches_after_evictions():
+    rng = random.Random(42)
+    store = LogStore(300)
+    index = TrigramIndex()
+
+    for _ in range(20):
+        logs = make_logs(rng, rng.randint(1, 120))
+        evicted = store.extend(logs)
+
+        # as the app does, new logs first, they may be among the evicted ones
+        index.add(logs)
+        index.remove(evicted)
+
+        assert index.end_seq == store.next_seq
+        for compiled in FILTERS:
+            assert_superset(index, store, compiled)
+
+
+def test_candidates_cover_matches_after_reindexing():
+    rng = random.Random(7)
+    store = LogStore(200)
+    index: TrigramIndex | None = TrigramIndex()
+
+    for round_ in range(12):
+        logs = make_logs(rng, rng.randint(1, 150))
+        evicted = store.extend(logs)
+        if index is not None:
+            index.add(logs)
+            index.remove(evicted)
+
+        # toggled every few rounds, turned on it indexes the whole store like the
+        # app's set_indexing does
+        if round_ % 3 == 2:
+            if index is None:
+                index = TrigramIndex()
+                index.add(store)
+            else:
+                index = None
+
+        if index is not None:
+            for compiled in FILTERS:
+                assert_superset(index, store, compiled)
+
+
+def test_emptied_index_has_no_candidates():
+    index = TrigramIndex()
+    store = LogStore(2)
+    logs = [Log("error one"), Log("error two")]
+
+    store.extend(logs)
+    index.add(logs)
+    index.remove(logs)
+
+    assert index.term_candidates("error") == set()
+    assert index.term_candidates("er") is None
+    assert index.memory_usage == 0